@@ -0,0 +1,524 @@
+import argparse
+import cProfile
+import json
+import os
+import platform
+import pstats
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+import finansial_ekosistem as eko
+import finansial_storage as storage
+import finansial_hash
+import finansial_features
+import finansial_parallel
+import finansial_ledger
+import finansial_generate
+
+# 1. Build Synthetic DataFrames Shaped Like the CSV Files
+def random_hashes(rng, n):
+    # Hex strings with the same length and entropy as SHA-256 digests
+    digits = rng.bytes(32 * n).hex()
+    return [digits[i:i + 64] for i in range(0, 64 * n, 64)]
+
+def make_frames(n_transactions, n_customers=None, n_companies=10, n_assessments=None, seed=42):
+    rng = np.random.default_rng(seed)
+    n_customers = n_customers or max(n_transactions // 10, 1)
+    n_assessments = n_assessments or max(n_transactions // 10, 1)
+
+    companies_df = pd.DataFrame({
+        'CompanyID': np.arange(1, n_companies + 1),
+        'Name': [f"Company {i}" for i in range(1, n_companies + 1)],
+        'Address': [f"Address {i}" for i in range(1, n_companies + 1)],
+    })
+    customers_df = pd.DataFrame({
+        'CustomerID': np.arange(1, n_customers + 1),
+        'Name': [f"Customer {i}" for i in range(1, n_customers + 1)],
+        'Phone': [f"Phone {i}" for i in range(1, n_customers + 1)],
+        'Address': [f"Address {i}" for i in range(1, n_customers + 1)],
+    })
+    transactions_df = pd.DataFrame({
+        'TransactionID': np.arange(1, n_transactions + 1),
+        'Amount': rng.integers(1000, 5001, n_transactions),
+        'Method': rng.choice(['Credit', 'Debit', 'Transfer'], n_transactions),
+        'CustomerID': rng.integers(1, n_customers + 1, n_transactions),
+        'CompanyID': rng.integers(1, n_companies + 1, n_transactions),
+        'Timestamp': '2024-12-11 19:33:36.223359',
+        'Hash': random_hashes(rng, n_transactions),
+    })
+    risk_assessment_df = pd.DataFrame({
+        'AssessmentID': np.arange(1, n_assessments + 1),
+        'RiskScore': rng.uniform(0.5, 0.9, n_assessments),
+        'Timestamp': '2024-12-11 19:33:36.239003',
+        'CustomerID': rng.integers(1, n_customers + 1, n_assessments),
+        'TransactionID': rng.integers(1, n_transactions + 1, n_assessments),
+    })
+    return companies_df, customers_df, transactions_df, risk_assessment_df
+
+# 2. Row-by-Row Loader Kept as the Baseline for Comparison
+def initialize_entities_iterrows(companies_df, customers_df, transactions_df, risk_assessment_df):
+    companies = [eko.Company(row['CompanyID'], row['Name'], row['Address'])
+                 for _, row in companies_df.iterrows()]
+    customers = [eko.Customer(row['CustomerID'], row['Name'], row['Phone'], row['Address'])
+                 for _, row in customers_df.iterrows()]
+    transactions = [eko.Transaction(row['TransactionID'], row['Amount'], row['Method'], row['CustomerID'],
+                                    row['CompanyID'], row['Timestamp'], row['Hash'])
+                    for _, row in transactions_df.iterrows()]
+    risk_assessments = [eko.RiskAssessment(row['AssessmentID'], row['RiskScore'], row['CustomerID'],
+                                           row['TransactionID'], row['Timestamp'])
+                        for _, row in risk_assessment_df.iterrows()]
+    return companies, customers, transactions, risk_assessments
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+# 3. Benchmark Entity Loading Against Row Count
+def bench_initialize_entities(sizes, baseline_limit=100000):
+    print(f"{'rows':>10} {'columnar s':>12} {'rows/s':>12} {'iterrows s':>12} {'speedup':>8}")
+    for size in sizes:
+        frames = make_frames(size)
+        elapsed, (_, _, transactions, _) = timed(eko.initialize_entities, *frames)
+        # Index construction is part of the cost of getting O(1) lookups
+        index_elapsed, _ = timed(eko.index_entities, [], [], transactions)
+        elapsed += index_elapsed
+
+        # The row-by-row loader is too slow to run at the largest sizes
+        if size <= baseline_limit:
+            baseline, _ = timed(initialize_entities_iterrows, *frames)
+            print(f"{size:>10} {elapsed:>12.3f} {size / elapsed:>12.0f} {baseline:>12.3f} {baseline / elapsed:>7.1f}x")
+        else:
+            print(f"{size:>10} {elapsed:>12.3f} {size / elapsed:>12.0f} {'-':>12} {'-':>8}")
+
+# 4. Nested-Loop Linker Kept as the Baseline for Comparison
+def link_nested_loops(transactions, risk_assessments):
+    for transaction in transactions:
+        for risk_assessment in risk_assessments:
+            if transaction.transaction_id == risk_assessment.transaction_id:
+                transaction.add_risk_assessment(risk_assessment)
+
+# 5. Benchmark Linking Against Row Count, Full and Incremental
+def bench_link(sizes, baseline_limit=10000, batch_size=100):
+    print(f"{'rows':>10} {'hash join s':>12} {'orphans':>8} {'dupes':>8} {'incremental s':>14} {'nested s':>10}")
+    for size in sizes:
+        _, _, transactions, risk_assessments = eko.initialize_entities(*make_frames(size))
+        elapsed, report = timed(eko.link_risk_assessments_to_transactions, transactions, risk_assessments)
+
+        # Incremental linking of a small batch against the already indexed history
+        linker = eko.RiskAssessmentLinker(transactions)
+        linker.link(risk_assessments)
+        incremental, _ = timed(linker.link, risk_assessments[:batch_size])
+
+        baseline = '-'
+        if size <= baseline_limit:
+            baseline = f"{timed(link_nested_loops, transactions, risk_assessments)[0]:.3f}"
+        print(f"{size:>10} {elapsed:>12.4f} {len(report.orphaned):>8} {len(report.duplicates):>8} "
+              f"{incremental:>14.6f} {baseline:>10}")
+
+# 6. Check the Lightweight Scorer Matches sklearn Bit for Bit
+def check_scorer_parity(model, scorer, n=1000000, seed=42):
+    rng = np.random.default_rng(seed)
+    # Integer amounts as in the CSV plus arbitrary floats
+    amounts = np.concatenate([rng.integers(0, 10**7, n // 2), rng.uniform(-1e6, 1e6, n - n // 2)])
+    expected = model.predict(pd.DataFrame({'Amount': amounts}))
+    assert np.array_equal(scorer.predict(amounts), expected), "batch predictions differ from sklearn"
+
+    single = np.array([scorer.predict_one(amount) for amount in amounts[:10000].tolist()])
+    assert np.array_equal(single, expected[:10000]), "single predictions differ from sklearn"
+
+    restored = eko.LinearRiskScorer.from_dict(scorer.to_dict())
+    assert np.array_equal(restored.predict(amounts), expected), "exported scorer differs from sklearn"
+
+def per_call(func, calls):
+    start = time.perf_counter()
+    for amount in calls:
+        func(amount)
+    return (time.perf_counter() - start) / len(calls) * 1e6
+
+# 7. Benchmark Scorer Latency Against RiskAssessment.predict_risk
+def bench_scorer(calls=2000, batch=1000000):
+    _, _, transactions_df, risk_assessment_df = make_frames(10000)
+    model = eko.train_risk_model(risk_assessment_df, transactions_df)
+    scorer = eko.LinearRiskScorer.from_model(model)
+    check_scorer_parity(model, scorer)
+    print("parity: bit-identical to LinearRegression.predict")
+
+    amounts = np.random.default_rng(0).integers(100, 10000, calls).tolist()
+    sklearn_assessment = eko.RiskAssessment(1, 0, 1, 1, None, model=model)
+    scorer_assessment = eko.RiskAssessment(1, 0, 1, 1, None, model=scorer)
+    print(f"{'path':<40} {'us/call':>10}")
+    print(f"{'RiskAssessment.predict_risk (sklearn)':<40} {per_call(sklearn_assessment.predict_risk, amounts):>10.2f}")
+    print(f"{'RiskAssessment.predict_risk (scorer)':<40} {per_call(scorer_assessment.predict_risk, amounts):>10.2f}")
+    print(f"{'LinearRiskScorer.predict_one':<40} {per_call(scorer.predict_one, amounts):>10.2f}")
+
+    batch_amounts = np.random.default_rng(1).integers(100, 10000, batch)
+    sklearn_elapsed, _ = timed(model.predict, pd.DataFrame({'Amount': batch_amounts}))
+    scorer_elapsed, _ = timed(scorer.predict, batch_amounts)
+    print(f"{'batch of ' + str(batch) + ' (sklearn) s':<40} {sklearn_elapsed:>10.4f}")
+    print(f"{'batch of ' + str(batch) + ' (scorer) s':<40} {scorer_elapsed:>10.4f}")
+
+# 8. Write Synthetic Frames as the Four CSV Files
+def write_csvs(directory, frames):
+    for name, df in zip(eko.DATASETS, frames):
+        df.to_csv(os.path.join(directory, f"{name}.csv"), index=False)
+
+IMPORT_SNIPPET = ("import time; start = time.perf_counter(); import finansial_ekosistem as eko; "
+                  "imported = time.perf_counter(); eko.load_data(); "
+                  "print(imported - start, time.perf_counter() - imported)")
+
+# 9. Benchmark Import Cost Against Data Size
+def bench_import(sizes, repeats=3):
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=package_dir)
+    print(f"{'rows':>10} {'import s':>10} {'first load_data s':>18}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            write_csvs(directory, make_frames(size))
+            # Fresh interpreter per run so nothing is already imported; keep the fastest run
+            runs = [subprocess.run([sys.executable, '-c', IMPORT_SNIPPET], cwd=directory, env=env,
+                                   capture_output=True, text=True, check=True).stdout.split()
+                    for _ in range(repeats)]
+            import_s, load_s = min((float(a), float(b)) for a, b in runs)
+        print(f"{size:>10} {import_s:>10.3f} {load_s:>18.3f}")
+
+def frame_megabytes(frames):
+    return sum(df.memory_usage(deep=True).sum() for df in frames) / 2**20
+
+# 10. Benchmark Typed Parquet Against CSV for Load Time and Memory
+def bench_storage(sizes):
+    print(f"{'rows':>10} {'reader':<24} {'full s':>8} {'full MB':>9} {'model cols s':>13} {'model MB':>9}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            write_csvs(directory, make_frames(size))
+            csv_paths = {name: os.path.join(directory, f"{name}.csv") for name in eko.DATASETS}
+            readers = {
+                'pd.read_csv': lambda name, columns=None: pd.read_csv(csv_paths[name], usecols=columns),
+                'typed csv': lambda name, columns=None: storage.read_dataset(name, columns, path=csv_paths[name]),
+            }
+            if storage.HAVE_PARQUET:
+                storage.convert_to_parquet(directory=directory)
+                readers['parquet'] = lambda name, columns=None: storage.read_dataset(name, columns, directory=directory)
+
+            for label, reader in readers.items():
+                full_s, full = timed(lambda: [reader(name) for name in eko.DATASETS])
+                model_s, model = timed(lambda: [reader(name, columns) for name, columns in eko.TRAINING_COLUMNS.items()])
+                print(f"{size:>10} {label:<24} {full_s:>8.3f} {frame_megabytes(full):>9.1f} "
+                      f"{model_s:>13.3f} {frame_megabytes(model):>9.1f}")
+
+# 11. Benchmark Bulk Hashing Across Pool Sizes
+def bench_hash(rows=1000000, worker_counts=(1, 2, 4, 8)):
+    _, _, transactions_df, _ = make_frames(rows)
+    columns = [transactions_df[column].tolist() for column in ('TransactionID', 'Amount', 'Timestamp')]
+    serial, expected = timed(finansial_hash.hash_fields, *columns, workers=1)
+    print(f"{'executor':<10} {'workers':>8} {'s':>8} {'rows/s':>12}")
+    print(f"{'serial':<10} {1:>8} {serial:>8.3f} {rows / serial:>12.0f}")
+    for executor in ('thread', 'process'):
+        for workers in worker_counts:
+            with finansial_hash.make_pool(workers, executor) as pool:
+                elapsed, hashes = timed(finansial_hash.hash_fields, *columns, pool=pool)
+            assert hashes == expected
+            print(f"{executor:<10} {workers:>8} {elapsed:>8.3f} {rows / elapsed:>12.0f}")
+
+# 12. Benchmark Incremental Model Updates Against a Full Refit
+def bench_incremental(sizes, new_rows=100):
+    import sklearn.linear_model  # noqa: F401  Imported up front so the first refit is not charged for it
+    print(f"{'history':>10} {'full refit s':>13} {'update s':>10} {'max coef rel diff':>18}")
+    for size in sizes:
+        frames = make_frames(size, n_assessments=size)
+        _, _, transactions_df, risk_assessment_df = frames
+        _, _, transactions, risk_assessments = eko.initialize_entities(*frames)
+        transactions_by_id = eko.index_entities([], [], transactions)[2]
+        incremental = eko.train_incremental_risk_model(risk_assessment_df.iloc[:-new_rows], transactions_df)
+
+        # Refitting on history plus the new rows versus merging only the new rows' statistics
+        refit_s, model = timed(eko.train_risk_model, risk_assessment_df, transactions_df)
+        update_s, _ = timed(incremental.update_from_assessments, risk_assessments[-new_rows:], transactions_by_id)
+
+        # Parity with the batch fit, in relative terms since the merge order differs
+        coef = np.append(incremental.coef_, incremental.intercept_)
+        expected = np.append(model.coef_, model.intercept_)
+        diff = np.max(np.abs(coef - expected) / np.abs(expected))
+        assert diff < 1e-9, "incremental fit diverged from LinearRegression"
+        print(f"{size:>10} {refit_s:>13.4f} {update_s:>10.6f} {diff:>18.2e}")
+
+# 13. Benchmark Feature Store Updates and Lookups
+def bench_features(n_customers=1000000, n_transactions=5000000, lookups=10000, batch=100000):
+    rng = np.random.default_rng(42)
+    customer_ids = rng.integers(1, n_customers + 1, n_transactions)
+    company_ids = rng.integers(1, 11, n_transactions)
+    amounts = rng.integers(1000, 5001, n_transactions)
+    timestamps = np.datetime64('2024-12-11', 'us') + np.sort(rng.integers(0, 365 * 86400 * 10**6, n_transactions))
+
+    store = finansial_features.FeatureStore(n_customers, 10)
+    update_s, _ = timed(lambda: [store.update(customer_ids[i:i + batch], company_ids[i:i + batch],
+                                              amounts[i:i + batch], timestamps[i:i + batch])
+                                 for i in range(0, n_transactions, batch)])
+    print(f"customers: {n_customers}, transactions: {n_transactions}")
+    print(f"{'update':<28} {n_transactions / update_s:>12.0f} rows/s")
+
+    # One row at a time, as an interactive scoring request would
+    picks = rng.integers(1, n_customers + 1, lookups).tolist()
+    now = timestamps[-1:]
+    single_s, _ = timed(lambda: [store.features([customer_id], [1], [1000], now) for customer_id in picks])
+    print(f"{'single-row lookup':<28} {single_s / lookups * 1e6:>12.2f} us/row")
+
+    batch_ids = rng.integers(1, n_customers + 1, batch)
+    batch_s, _ = timed(store.features, batch_ids, np.ones(batch, dtype=np.int64), np.full(batch, 1000),
+                       np.repeat(now, batch))
+    print(f"{'batch lookup':<28} {batch_s / batch * 1e9:>12.1f} ns/row")
+
+# 14. Transaction Class Without __slots__, Kept as the Baseline for Memory
+class DictTransaction:
+    def __init__(self, transaction_id, amount, method, customer_id, company_id, timestamp, hash):
+        self.transaction_id = transaction_id
+        self.amount = amount
+        self.method = method
+        self.customer_id = customer_id
+        self.company_id = company_id
+        self.timestamp = timestamp
+        self.hash = hash
+        self.risk_assessment = None
+
+def traced_bytes(build):
+    # Memory still held by whatever build() returns, once its temporaries are freed
+    tracemalloc.start()
+    result = build()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return held, result
+
+# 15. Measure Memory per Transaction Row for Each Representation
+def bench_memory(sizes):
+    columns = ['TransactionID', 'Amount', 'Method', 'CustomerID', 'CompanyID', 'Timestamp', 'Hash']
+    print(f"{'rows':>10} {'representation':<28} {'bytes/row':>10} {'MB':>9}")
+    for size in sizes:
+        _, _, transactions_df, _ = make_frames(size)
+        # Typed timestamps, as read_dataset returns them
+        transactions_df = transactions_df.assign(Timestamp=pd.to_datetime(transactions_df['Timestamp']))
+        builders = {
+            'objects with __dict__': lambda: [DictTransaction(*row) for row in
+                                              zip(*(transactions_df[column].tolist() for column in columns))],
+            'objects with __slots__': lambda: [eko.Transaction(*row) for row in
+                                               zip(*(transactions_df[column].tolist() for column in columns))],
+            'TransactionTable': lambda: eko.TransactionTable.from_frame(transactions_df),
+        }
+        for label, build in builders.items():
+            held, _ = traced_bytes(build)
+            print(f"{size:>10} {label:<28} {held / size:>10.1f} {held / 2**20:>9.1f}")
+
+# 16. Benchmark Partitioned Scoring and Aggregation Across Worker Counts
+def bench_parallel(rows=10000000, n_customers=1000000, worker_counts=(1, 2, 4, 8)):
+    rng = np.random.default_rng(42)
+    transactions_df = pd.DataFrame({
+        'CustomerID': rng.integers(1, n_customers + 1, rows),
+        'CompanyID': rng.integers(1, 11, rows),
+        'Amount': rng.integers(1000, 5001, rows),
+    })
+    model = eko.LinearRiskScorer([1e-5], 0.69)
+    print(f"rows: {rows}, customers: {n_customers}, cpus: {os.cpu_count()}")
+    print(f"{'workers':>8} {'s':>8} {'rows/s':>12} {'speedup':>8}")
+    baseline = expected = None
+    for workers in worker_counts:
+        elapsed, (customers, companies) = timed(finansial_parallel.summarize_partitioned, transactions_df, model,
+                                                workers=workers)
+        if expected is None:
+            baseline, expected = elapsed, (customers, companies)
+        else:
+            pd.testing.assert_frame_equal(customers, expected[0])
+            pd.testing.assert_frame_equal(companies, expected[1], check_exact=False)
+        print(f"{workers:>8} {elapsed:>8.3f} {rows / elapsed:>12.0f} {baseline / elapsed:>7.2f}x")
+
+# 17. Benchmark Ledger Append, Open, Tail Read and Hash Chain Verification
+def bench_ledger(sizes):
+    print(f"{'rows':>10} {'append s':>9} {'open ms':>8} {'tail ms':>8} {'verify s':>9} {'verify rows/s':>14}")
+    for size in sizes:
+        _, _, transactions, _ = eko.initialize_entities(*make_frames(size))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'ledger.bin')
+            ledger = finansial_ledger.Ledger(path)
+            append, _ = timed(ledger.append, transactions, sync=True)
+            ledger.close()
+            opened, ledger = timed(finansial_ledger.Ledger, path)
+            tail, _ = timed(ledger.to_frame, size - 10)
+            verify, broken = timed(ledger.verify)
+            ledger.close()
+        assert broken is None
+        print(f"{size:>10} {append:>9.3f} {opened * 1000:>8.2f} {tail * 1000:>8.2f} {verify:>9.3f} "
+              f"{size / verify:>14.0f}")
+
+# 18. Time and Measure Peak Memory of One Pipeline Stage, Optionally Under a Profiler
+PIPELINE_STAGES = ('load_data', 'initialize_entities', 'link', 'train_risk_model', 'predict_risk',
+                   'simulate_new_transactions')
+
+def profile_stage(profiler, path, func, *args, **kwargs):
+    # Writes the profile next to the results and prints its top entries
+    if profiler == 'cprofile':
+        profile = cProfile.Profile()
+        result = profile.runcall(func, *args, **kwargs)
+        profile.dump_stats(f"{path}.prof")
+        pstats.Stats(profile).sort_stats('cumulative').print_stats(15)
+    else:
+        tracemalloc.start(25)
+        result = func(*args, **kwargs)
+        top = tracemalloc.take_snapshot().statistics('lineno')[:15]
+        tracemalloc.stop()
+        with open(f"{path}.tracemalloc.txt", 'w') as f:
+            f.writelines(f"{stat}\n" for stat in top)
+        print('\n'.join(str(stat) for stat in top))
+    return result
+
+def run_stage(func, *args, calls=1, profiler=None, profile_path=None, **kwargs):
+    # Timed without tracing, then run once more under tracemalloc for the peak, since tracing slows allocation
+    def call():
+        for _ in range(calls):
+            result = func(*args, **kwargs)
+        return result
+
+    elapsed, result = timed(call)
+    tracemalloc.start()
+    func(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    if profiler:
+        profile_stage(profiler, profile_path, call)
+    return {'seconds': elapsed, 'calls': calls, 'seconds_per_call': elapsed / calls, 'peak_mb': peak / 1e6}, result
+
+# 19. Benchmark Every Pipeline Stage on Datasets Written by finansial_generate
+def bench_pipeline(sizes, output=None, profile_stages=(), profiler='cprofile', profile_dir='.', compare=None,
+                   predict_calls=10000, simulate_calls=100, seed=42):
+    import sklearn.linear_model  # noqa: F401  Imported up front so the first train_risk_model is not charged for it
+    results = []
+    print(f"{'rows':>10} {'stage':>26} {'s':>9} {'us/call':>10} {'peak MB':>9}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            generated = finansial_generate.generate_dataset(size, n_customers=max(size // 100, 100), seed=seed,
+                                                            directory=directory)
+            results.append({'rows': size, 'stage': 'generate_dataset', 'seconds': generated['seconds'], 'calls': 1,
+                            'seconds_per_call': generated['seconds'], 'peak_mb': None})
+
+            def stage(name, func, *args, calls=1):
+                record, result = run_stage(func, *args, calls=calls,
+                                           profiler=profiler if name in profile_stages else None,
+                                           profile_path=os.path.join(profile_dir, f"{name}_{size}"))
+                results.append({'rows': size, 'stage': name, **record})
+                return result
+
+            frames = stage('load_data', lambda: tuple(storage.read_dataset(name, directory=directory)
+                                                      for name in eko.DATASETS))
+        companies, customers, transactions, risk_assessments = stage('initialize_entities', eko.initialize_entities,
+                                                                     *frames)
+        stage('link', eko.link_risk_assessments_to_transactions, transactions, risk_assessments)
+        model = eko.LinearRiskScorer.from_model(stage('train_risk_model', eko.train_risk_model, frames[3], frames[2]))
+        assessment = eko.RiskAssessment('RA1', 0.0, customers[0].customer_id, transactions[0].transaction_id,
+                                        transactions[0].timestamp, model)
+        stage('predict_risk', assessment.predict_risk, transactions[0].amount, calls=predict_calls)
+        stage('simulate_new_transactions', eko.simulate_new_transactions, customers, companies, calls=simulate_calls)
+
+        for record in results:
+            if record['rows'] == size:
+                peak = 'n/a' if record['peak_mb'] is None else f"{record['peak_mb']:.1f}"
+                print(f"{size:>10} {record['stage']:>26} {record['seconds']:>9.3f} "
+                      f"{record['seconds_per_call'] * 1e6:>10.1f} {peak:>9}")
+
+    report = {
+        'environment': {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+                        'platform': platform.platform(), 'cpus': os.cpu_count(), 'seed': seed,
+                        'time': time.strftime('%Y-%m-%dT%H:%M:%S')},
+        'results': results,
+    }
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if compare:
+        # Ratios above 1 are slower than the earlier run
+        with open(compare) as f:
+            previous = {(record['rows'], record['stage']): record for record in json.load(f)['results']}
+        print(f"{'rows':>10} {'stage':>26} {'time ratio':>11}")
+        for record in results:
+            before = previous.get((record['rows'], record['stage']))
+            if before and before['seconds_per_call']:
+                print(f"{record['rows']:>10} {record['stage']:>26} "
+                      f"{record['seconds_per_call'] / before['seconds_per_call']:>10.2f}x")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the finansial risk pipeline")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    entities = subparsers.add_parser('entities', help="initialize_entities load time by row count")
+    entities.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+
+    link = subparsers.add_parser('link', help="risk assessment linking time by row count")
+    link.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+
+    subparsers.add_parser('scorer', help="scorer parity with sklearn and per-call latency")
+
+    imports = subparsers.add_parser('import', help="finansial_ekosistem import time by data size")
+    imports.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+
+    storage_parser = subparsers.add_parser('storage', help="Parquet versus CSV load time and memory")
+    storage_parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+
+    hash_parser = subparsers.add_parser('hash', help="bulk SHA-256 throughput by executor and worker count")
+    hash_parser.add_argument('--rows', type=int, default=1000000)
+
+    incremental = subparsers.add_parser('incremental', help="incremental model update versus full refit")
+    incremental.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+
+    features = subparsers.add_parser('features', help="feature store update and lookup latency")
+    features.add_argument('--customers', type=int, default=1000000)
+    features.add_argument('--transactions', type=int, default=5000000)
+
+    memory = subparsers.add_parser('memory', help="memory per transaction row by representation")
+    memory.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+
+    parallel = subparsers.add_parser('parallel', help="partitioned scoring scaling across worker counts")
+    parallel.add_argument('--rows', type=int, default=10000000)
+    parallel.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+
+    ledger = subparsers.add_parser('ledger', help="ledger append, open, tail read and verification time")
+    ledger.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+
+    pipeline = subparsers.add_parser('pipeline', help="every pipeline stage on generated datasets, as JSON")
+    pipeline.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    pipeline.add_argument('--output', default='bench_pipeline.json', help="JSON results file")
+    pipeline.add_argument('--compare', help="earlier JSON results to compare against")
+    pipeline.add_argument('--profile', nargs='+', default=[], choices=PIPELINE_STAGES, help="stages to profile")
+    pipeline.add_argument('--profiler', choices=['cprofile', 'tracemalloc'], default='cprofile')
+    pipeline.add_argument('--profile-dir', default='.')
+
+    args = parser.parse_args()
+    if args.benchmark == 'entities':
+        bench_initialize_entities(args.sizes)
+    elif args.benchmark == 'link':
+        bench_link(args.sizes)
+    elif args.benchmark == 'scorer':
+        bench_scorer()
+    elif args.benchmark == 'import':
+        bench_import(args.sizes)
+    elif args.benchmark == 'storage':
+        bench_storage(args.sizes)
+    elif args.benchmark == 'hash':
+        bench_hash(args.rows)
+    elif args.benchmark == 'incremental':
+        bench_incremental(args.sizes)
+    elif args.benchmark == 'features':
+        bench_features(args.customers, args.transactions)
+    elif args.benchmark == 'memory':
+        bench_memory(args.sizes)
+    elif args.benchmark == 'parallel':
+        bench_parallel(args.rows, worker_counts=args.workers)
+    elif args.benchmark == 'ledger':
+        bench_ledger(args.sizes)
+    elif args.benchmark == 'pipeline':
+        bench_pipeline(args.sizes, args.output, args.profile, args.profiler, args.profile_dir, args.compare)
+
+if __name__ == '__main__':
+    main()
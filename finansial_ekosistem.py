@@ -1,18 +1,67 @@
+import os
+import json
+import functools
+import time
 import pandas as pd
 import random
 import hashlib
 from datetime import datetime
-from sklearn.linear_model import LinearRegression
 import numpy as np
+from finansial_features import FEATURE_NAMES, FeatureStore
+from finansial_metrics import METRICS
+from finansial_storage import dataset_path, read_dataset
 
-# Load data from CSV files
-companies_df = pd.read_csv('companies.csv')
-customers_df = pd.read_csv('customers.csv')
-transactions_df = pd.read_csv('transactions.csv')
-risk_assessment_df = pd.read_csv('risk_assessment.csv')
+# Predicted risk scores above this threshold flag a transaction as risky
+RISK_THRESHOLD = float(os.environ.get('FINANSIAL_RISK_THRESHOLD', 0.73))
+
+# Score with the customer and company features of finansial_features instead of Amount alone
+RISK_FEATURES = os.environ.get('FINANSIAL_RISK_FEATURES') == '1'
+
+# Trained model artifact, reused until the training data changes
+MODEL_ARTIFACT_PATH = 'risk_model.json'
+FEATURE_MODEL_ARTIFACT_PATH = 'risk_model_features.json'
+MODEL_ARTIFACT_VERSION = 1
+
+# Checkpoint of the incremental model's sufficient statistics
+MODEL_STATS_PATH = 'risk_model_stats.json'
+
+# Datasets behind companies_df, customers_df, transactions_df and risk_assessment_df
+DATASETS = ('companies', 'customers', 'transactions', 'risk_assessment')
+
+# Columns the risk model needs, so training never loads names, hashes or timestamps
+TRAINING_COLUMNS = {'risk_assessment': ['TransactionID', 'RiskScore'], 'transactions': ['TransactionID', 'Amount']}
+FEATURE_TRAINING_COLUMNS = ['CustomerID', 'CompanyID', 'Timestamp']  # Also read when training with features
+
+def data_paths(names=DATASETS):
+    # Parquet copies are preferred over the CSV files when present (see finansial_storage)
+    return tuple(dataset_path(name) for name in names)
+
+def training_data_paths():
+    return data_paths(TRAINING_COLUMNS)
+
+# Load data on first use rather than at import, and only again once the files change
+def load_data():
+    METRICS.count('load_data.calls')  # _read_data is timed only on a cache miss, which gives the hit rate
+    return _read_data(data_version(data_paths()))
+
+@functools.lru_cache(maxsize=1)
+@METRICS.timer('load_data')
+def _read_data(version):
+    return tuple(read_dataset(name, path=path) for name, (path, _, _) in zip(DATASETS, version))
+
+@METRICS.timer('load_training_data')
+def load_training_data(paths=None, features=False):
+    paths = paths or training_data_paths()
+    projection = dict(TRAINING_COLUMNS)
+    if features:
+        projection['transactions'] = projection['transactions'] + FEATURE_TRAINING_COLUMNS
+    return tuple(read_dataset(name, columns, path=path)
+                 for (name, columns), path in zip(projection.items(), paths))
 
 # 1. Define the Company Class
 class Company:
+    __slots__ = ('company_id', 'name', 'address', 'transactions')
+
     def __init__(self, company_id, name, address):
         self.company_id = company_id
         self.name = name
@@ -21,6 +70,8 @@ class Company:
 
 # 2. Define the Customer Class
 class Customer:
+    __slots__ = ('customer_id', 'name', 'phone', 'address', 'transactions')
+
     def __init__(self, customer_id, name, phone, address):
         self.customer_id = customer_id
         self.name = name
@@ -33,6 +84,9 @@ class Customer:
 
 # 3. Define the Transaction Class
 class Transaction:
+    __slots__ = ('transaction_id', 'amount', 'method', 'customer_id', 'company_id', 'timestamp', 'hash',
+                 'risk_assessment')
+
     def __init__(self, transaction_id, amount, method, customer_id, company_id, timestamp, hash):
         self.transaction_id = transaction_id
         self.amount = amount
@@ -48,6 +102,8 @@ class Transaction:
 
 # 4. Define the RiskAssessment Class with Prediction Logic
 class RiskAssessment:
+    __slots__ = ('assessment_id', 'risk_score', 'timestamp', 'customer_id', 'transaction_id', 'model')
+
     def __init__(self, assessment_id, risk_score, customer_id, transaction_id, timestamp, model=None):
         self.assessment_id = assessment_id
         self.risk_score = risk_score
@@ -56,8 +112,14 @@ class RiskAssessment:
         self.transaction_id = transaction_id
         self.model = model  # The linear regression model for predictions
 
-    def predict_risk(self, amount):
+    @METRICS.timer('predict_risk')
+    def predict_risk(self, amount, transaction=None, feature_store=None):
+        # A multi-feature model also needs the transaction and the feature store it was trained with
+        if feature_store is not None:
+            return float(score_batch(self.model, [transaction], feature_store=feature_store)[0][0])
         # Use the model to predict the risk based on the transaction amount
+        if hasattr(self.model, 'predict_one'):
+            return self.model.predict_one(amount)  # LinearRiskScorer skips the DataFrame round trip
         if self.model:
             # Ensure that the input is in the same format as the training data
             X_new = pd.DataFrame([[amount]], columns=['Amount'])  # Create DataFrame with the same column name
@@ -65,96 +127,546 @@ class RiskAssessment:
             return predicted_risk
         return None
 
-# 5. Initialize Entities from CSV Data
-def initialize_entities():
-    # Initialize companies
-    companies = []
-    for _, row in companies_df.iterrows():
-        companies.append(Company(row['CompanyID'], row['Name'], row['Address']))
-
-    # Initialize customers
-    customers = []
-    for _, row in customers_df.iterrows():
-        customers.append(Customer(row['CustomerID'], row['Name'], row['Phone'], row['Address']))
-
-    # Initialize transactions
-    transactions = []
-    for _, row in transactions_df.iterrows():
-        transaction = Transaction(row['TransactionID'], row['Amount'], row['Method'], 
-                                  row['CustomerID'], row['CompanyID'], row['Timestamp'], row['Hash'])
-        transactions.append(transaction)
-
-    # Initialize risk assessments
-    risk_assessments = []
-    for _, row in risk_assessment_df.iterrows():
-        risk_assessment = RiskAssessment(row['AssessmentID'], row['RiskScore'], 
-                                         row['CustomerID'], row['TransactionID'], row['Timestamp'])
-        risk_assessments.append(risk_assessment)
+# 5. Compact Struct-of-Arrays Store for Transactions
+def decode_hashes(hashes, chunk_size=100000):
+    # Hex digests decoded a chunk at a time straight into one (rows, 32) array, so no 64-chars-per-row string
+    # of the whole column is ever built
+    digests = np.empty((len(hashes), 32), dtype=np.uint8)
+    for start in range(0, len(hashes), chunk_size):
+        chunk = bytes.fromhex(''.join(hashes.iloc[start:start + chunk_size].tolist()))
+        digests[start:start + len(chunk) // 32] = np.frombuffer(chunk, dtype=np.uint8).reshape(-1, 32)
+    return digests
 
-    return companies, customers, transactions, risk_assessments
+class TransactionTable:
+    def __init__(self, transaction_id, amount, method_codes, methods, customer_id, company_id, timestamp, hash_bytes):
+        self.transaction_id = transaction_id
+        self.amount = amount
+        self.method_codes = method_codes  # Index into methods, one byte per row
+        self.methods = methods
+        self.customer_id = customer_id
+        self.company_id = company_id
+        self.timestamp = timestamp
+        self.hash_bytes = hash_bytes  # Raw 32-byte SHA-256 digests, shape (rows, 32)
+        self.risk_assessments = {}  # Row -> RiskAssessment, only for assessed rows
+        self._sorted_ids = bool(np.all(transaction_id[1:] >= transaction_id[:-1]))
 
-# 6. Link Risk Assessments to Transactions
-def link_risk_assessments_to_transactions(transactions, risk_assessments):
+    @classmethod
+    def from_frame(cls, transactions_df):
+        methods = pd.Categorical(transactions_df['Method'])
+        # Copies, so the table owns its arrays and the frame can be dropped
+        return cls(
+            transactions_df['TransactionID'].to_numpy(np.int64, copy=True),
+            transactions_df['Amount'].to_numpy(copy=True),
+            methods.codes.astype(np.uint8),
+            list(methods.categories),
+            transactions_df['CustomerID'].to_numpy(np.int64, copy=True),
+            transactions_df['CompanyID'].to_numpy(np.int64, copy=True),
+            pd.to_datetime(transactions_df['Timestamp'], format='ISO8601').to_numpy('datetime64[us]', copy=True),
+            decode_hashes(transactions_df['Hash']),
+        )
+
+    def __len__(self):
+        return len(self.transaction_id)
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return TransactionView(self, row)
+
+    def __iter__(self):
+        return (TransactionView(self, row) for row in range(len(self)))
+
+    def find(self, transaction_id):
+        # Binary search when IDs are sorted, as in transactions.csv; a scan otherwise
+        if self._sorted_ids:
+            row = int(np.searchsorted(self.transaction_id, transaction_id))
+            found = row < len(self) and self.transaction_id[row] == transaction_id
+        else:
+            rows = np.flatnonzero(self.transaction_id == transaction_id)
+            found, row = len(rows) > 0, int(rows[0]) if len(rows) else 0
+        return TransactionView(self, row) if found else None
+
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.transaction_id, self.amount, self.method_codes, self.customer_id,
+                                              self.company_id, self.timestamp, self.hash_bytes))
+
+class TransactionView:
+    # A row of a TransactionTable with the same attributes as Transaction
+    __slots__ = ('table', 'row')
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    transaction_id = property(lambda self: self.table.transaction_id[self.row].item())
+    amount = property(lambda self: self.table.amount[self.row].item())
+    method = property(lambda self: self.table.methods[self.table.method_codes[self.row]])
+    customer_id = property(lambda self: self.table.customer_id[self.row].item())
+    company_id = property(lambda self: self.table.company_id[self.row].item())
+    timestamp = property(lambda self: pd.Timestamp(self.table.timestamp[self.row]))
+    hash = property(lambda self: self.table.hash_bytes[self.row].tobytes().hex())
+    risk_assessment = property(lambda self: self.table.risk_assessments.get(self.row))
+
+    def add_risk_assessment(self, risk_assessment):
+        self.table.risk_assessments[self.row] = risk_assessment
+
+# 6. Initialize Entities from CSV Data
+@METRICS.timer('initialize_entities')
+def initialize_entities(companies_df=None, customers_df=None, transactions_df=None, risk_assessment_df=None,
+                        ledger=None):
+    # Any frame that is not passed in comes from the CSV files
+    if any(df is None for df in (companies_df, customers_df, transactions_df, risk_assessment_df)):
+        loaded = load_data()
+        companies_df, customers_df, transactions_df, risk_assessment_df = (
+            df if df is not None else default for df, default in
+            zip((companies_df, customers_df, transactions_df, risk_assessment_df), loaded))
+
+    # Build every entity from whole columns at once instead of iterating row by row;
+    # tolist() converts each column to native Python values in a single pass
+    companies = [Company(*row) for row in zip(
+        *(companies_df[column].tolist() for column in ['CompanyID', 'Name', 'Address']))]
+
+    customers = [Customer(*row) for row in zip(
+        *(customers_df[column].tolist() for column in ['CustomerID', 'Name', 'Phone', 'Address']))]
+
+    transactions = [Transaction(*row) for row in zip(
+        *(transactions_df[column].tolist() for column in
+          ['TransactionID', 'Amount', 'Method', 'CustomerID', 'CompanyID', 'Timestamp', 'Hash']))]
+
+    risk_assessments = [RiskAssessment(*row) for row in zip(
+        *(risk_assessment_df[column].tolist() for column in
+          ['AssessmentID', 'RiskScore', 'CustomerID', 'TransactionID', 'Timestamp']))]
+
+    # Transactions appended to the ledger since the CSV files were written follow the CSV ones
+    if ledger is not None:
+        transactions.extend(ledger.transactions())
+
+    # Attach transactions to their customer and company through the ID indexes
+    companies_by_id, customers_by_id, _ = index_entities(companies, customers, [])
     for transaction in transactions:
+        customer = customers_by_id.get(transaction.customer_id)
+        if customer is not None:
+            customer.add_transaction(transaction)
+        company = companies_by_id.get(transaction.company_id)
+        if company is not None:
+            company.transactions.append(transaction)
+
+    return companies, customers, transactions, risk_assessments
+
+# 7. Index Entities by ID for O(1) Lookup
+def index_entities(companies, customers, transactions):
+    companies_by_id = {company.company_id: company for company in companies}
+    customers_by_id = {customer.customer_id: customer for customer in customers}
+    transactions_by_id = {transaction.transaction_id: transaction for transaction in transactions}
+    return companies_by_id, customers_by_id, transactions_by_id
+
+# 8. Link Risk Assessments to Transactions
+class LinkReport:
+    def __init__(self):
+        self.linked = 0
+        self.orphaned = []  # Assessments whose TransactionID is not known (yet)
+        self.duplicates = {}  # TransactionID -> every assessment seen for it, in arrival order
+
+class RiskAssessmentLinker:
+    def __init__(self, transactions=()):
+        self.transactions_by_id = {}
+        self.assessments_by_transaction = {}
+        self.orphaned_assessments = {}  # TransactionID -> assessments waiting for their transaction
+        self.duplicate_assessments = {}
+        self.add_transactions(transactions)
+
+    def add_transactions(self, transactions):
+        # Register new transactions and resolve assessments that arrived before them
+        report = LinkReport()
+        for transaction in transactions:
+            self.transactions_by_id[transaction.transaction_id] = transaction
+            for risk_assessment in self.orphaned_assessments.pop(transaction.transaction_id, []):
+                self._attach(transaction, risk_assessment, report)
+        return report
+
+    def link(self, risk_assessments):
+        # One dict lookup per assessment, so only the new assessments are scanned
+        report = LinkReport()
         for risk_assessment in risk_assessments:
-            if transaction.transaction_id == risk_assessment.transaction_id:
-                transaction.add_risk_assessment(risk_assessment)
+            transaction = self.transactions_by_id.get(risk_assessment.transaction_id)
+            if transaction is None:
+                self.orphaned_assessments.setdefault(risk_assessment.transaction_id, []).append(risk_assessment)
+                report.orphaned.append(risk_assessment)
+            else:
+                self._attach(transaction, risk_assessment, report)
+        return report
+
+    def _attach(self, transaction, risk_assessment, report):
+        transaction_id = transaction.transaction_id
+        previous = self.assessments_by_transaction.get(transaction_id)
+        if previous is not None:
+            # Keep the latest assessment linked, as before, but record every one seen
+            duplicates = self.duplicate_assessments.setdefault(transaction_id, [previous])
+            duplicates.append(risk_assessment)
+            report.duplicates[transaction_id] = duplicates
+        self.assessments_by_transaction[transaction_id] = risk_assessment
+        transaction.add_risk_assessment(risk_assessment)
+        report.linked += 1
+
+def link_risk_assessments_to_transactions(transactions, risk_assessments):
+    return RiskAssessmentLinker(transactions).link(risk_assessments)
+
+# 9. Shared Registry of Entities, Indexed by ID and by Name
+class EntityRegistry:
+    def __init__(self, companies, customers, transactions, risk_assessments, ledger=None, feature_store=None):
+        self.ledger = ledger  # New transactions are also appended here when given
+        self.feature_store = feature_store  # And folded into these aggregates, for the feature model
+        self.companies = companies
+        self.customers = customers
+        self.transactions = transactions
+        self.risk_assessments = risk_assessments
+        self.companies_by_id, self.customers_by_id, _ = index_entities(companies, customers, [])
+
+        # Names are not guaranteed to be unique; the first entity with a name wins, as with next()
+        self.companies_by_name = {}
+        for company in companies:
+            self.companies_by_name.setdefault(company.name, company)
+        self.customers_by_name = {}
+        for customer in customers:
+            self.customers_by_name.setdefault(customer.name, customer)
+
+        # The linker owns the TransactionID index and the assessments linked to each transaction
+        self.linker = RiskAssessmentLinker(transactions)
+        self.linker.link(risk_assessments)
+        self.transactions_by_id = self.linker.transactions_by_id
 
-# 7. Simulate New Transactions (Simplified)
-def simulate_new_transactions(customers, companies):
+        # Options for the selectboxes, built once
+        self.customer_names_df = pd.DataFrame({'Customer Name': list(self.customers_by_name)})
+        self.company_names_df = pd.DataFrame({'Company Name': list(self.companies_by_name)})
+
+    @classmethod
+    def from_data(cls, ledger=None, features=False):
+        companies, customers, transactions, risk_assessments = initialize_entities(ledger=ledger)
+        # The serving store covers every transaction loaded, including the ledger's
+        feature_store = FeatureStore().update_transactions(transactions) if features else None
+        return cls(companies, customers, transactions, risk_assessments, ledger=ledger, feature_store=feature_store)
+
+    def add_transaction(self, transaction):
+        self.add_transactions([transaction])
+
+    def add_transactions(self, transactions):
+        # One ledger write per batch
+        if self.ledger is not None:
+            self.ledger.append(transactions)
+        if self.feature_store is not None:
+            self.feature_store.update_transactions(transactions)
+        self.transactions.extend(transactions)
+        self.linker.add_transactions(transactions)
+        for transaction in transactions:
+            customer = self.customers_by_id.get(transaction.customer_id)
+            if customer is not None:
+                customer.add_transaction(transaction)
+            company = self.companies_by_id.get(transaction.company_id)
+            if company is not None:
+                company.transactions.append(transaction)
+
+    def add_risk_assessment(self, risk_assessment):
+        self.risk_assessments.append(risk_assessment)
+        return self.linker.link([risk_assessment])
+
+    def assessment_for(self, transaction_id):
+        return self.linker.assessments_by_transaction.get(transaction_id)
+
+# 10. Simulate New Transactions (Simplified)
+def random_transaction(customer, company):
+    amount = random.randint(100, 10000)  # Random transaction amount
+    method = random.choice(['Credit', 'Debit'])  # Random payment method
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    # Generate a unique transaction ID and hash
+    transaction_id = f"T{random.randint(10000, 99999)}"
+    hash = hashlib.sha256(f"{transaction_id}{amount}{method}{timestamp}".encode()).hexdigest()
+
+    # Create a new transaction, not yet attached to the customer or company
+    return Transaction(transaction_id, amount, method, customer.customer_id, company.company_id, timestamp, hash)
+
+def simulate_new_transactions(customers, companies, registry=None):
     new_transactions = []
     for _ in range(10):  # Simulate 10 new transactions (reduced number)
         customer = random.choice(customers)
         company = random.choice(companies)
-        amount = random.randint(100, 10000)  # Random transaction amount
-        method = random.choice(['Credit', 'Debit'])  # Random payment method
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Generate a unique transaction ID and hash
-        transaction_id = f"T{random.randint(10000, 99999)}"
-        hash = hashlib.sha256(f"{transaction_id}{amount}{method}{timestamp}".encode()).hexdigest()
-
-        # Create a new transaction
-        new_transaction = Transaction(transaction_id, amount, method, customer.customer_id, company.company_id, timestamp, hash)
-        customer.add_transaction(new_transaction)
-        company.transactions.append(new_transaction)
+        new_transaction = random_transaction(customer, company)
+        if registry is None:
+            customer.add_transaction(new_transaction)
+            company.transactions.append(new_transaction)
         new_transactions.append(new_transaction)
 
+    if registry is not None:
+        registry.add_transactions(new_transactions)  # Also indexes them and attaches them to customer and company
     return new_transactions
 
-# 8. Train Linear Regression Model on Historical Data
-def train_risk_model(risk_assessment_df, transactions_df):
+# 11. Train Linear Regression Model on Historical Data
+@METRICS.timer('train_risk_model')
+def train_risk_model(risk_assessment_df, transactions_df, feature_store=None):
+    if feature_store is None:
+        feature_names = ['Amount']  # For simplicity, using only transaction amount as feature
+    else:
+        # Customer and company aggregates from the feature store (finansial_features), each as it stood just
+        # before its transaction, so training sees what scoring will; pass an empty store, it is filled here
+        feature_names = feature_store.feature_names
+        features = pd.DataFrame(feature_store.point_in_time_features(transactions_df), columns=feature_names)
+        features['TransactionID'] = transactions_df['TransactionID'].to_numpy()
+        transactions_df = features
+
     # Preprocess data: Merge risk assessments and transactions to get features
-    df = pd.merge(risk_assessment_df, transactions_df, on='TransactionID')
-    
-    # Select relevant features for prediction
-    X = df[['Amount']]  # For simplicity, using only transaction amount as feature
+    df = pd.merge(risk_assessment_df[['TransactionID', 'RiskScore']], transactions_df, on='TransactionID')
+    X = df[feature_names]
     y = df['RiskScore']  # Target is the RiskScore
     
-    # Train Linear Regression model
+    # Train Linear Regression model (sklearn is only needed for training, not for serving)
+    from sklearn.linear_model import LinearRegression
     model = LinearRegression()
     model.fit(X, y)
     return model
 
-# 9. Simulate Risk Prediction for New Loan Request
+# 12. Lightweight Scorer Holding the Fitted Coefficients
+class LinearRiskScorer:
+    def __init__(self, coef, intercept, feature_names=('Amount',)):
+        self.coef_ = np.asarray(coef, dtype=np.float64).ravel()
+        self.intercept_ = np.float64(intercept)
+        self.feature_names = list(feature_names)
+        # Plain floats for the single-amount path
+        self._coef = float(self.coef_[0]) if len(self.coef_) == 1 else None
+        self._intercept = float(self.intercept_)
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(model.coef_, model.intercept_, getattr(model, 'feature_names_in_', ['Amount']))
+
+    def predict(self, X):
+        # Same arithmetic as LinearRegression.predict, minus sklearn's input validation
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(-1, 1)
+        return X @ self.coef_ + self.intercept_
+
+    def predict_one(self, amount):
+        if self._coef is None:
+            raise ValueError(f"Scorer uses {self.feature_names}; score it through predict() with all features")
+        return float(amount) * self._coef + self._intercept
+
+    def to_dict(self):
+        return {'coef': self.coef_.tolist(), 'intercept': float(self.intercept_),
+                'feature_names': self.feature_names}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['coef'], data['intercept'], data['feature_names'])
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+# 13. Incremental Risk Model Updated from Sufficient Statistics
+class IncrementalRiskModel:
+    def __init__(self, feature_names=('Amount',), half_life=None):
+        # half_life (seconds) down-weights older observations; None keeps the full history
+        self.feature_names = list(feature_names)
+        self.half_life = half_life
+        n_features = len(self.feature_names)
+        self.weight = 0.0
+        self.mean_x = np.zeros(n_features)
+        self.mean_y = 0.0
+        self.cov_xx = np.zeros((n_features, n_features))  # Co-moments around the means
+        self.cov_xy = np.zeros(n_features)
+        self.updated_at = None
+
+    def decay(self, now):
+        if self.half_life and self.updated_at is not None and now > self.updated_at:
+            factor = 0.5 ** ((now - self.updated_at) / self.half_life)
+            self.weight *= factor
+            self.cov_xx *= factor
+            self.cov_xy *= factor
+        # A batch stamped earlier than the last one must not move the clock back, or the next decay would repeat
+        self.updated_at = now if self.updated_at is None else max(self.updated_at, now)
+
+    def update(self, X, y, now=None):
+        # Merges the statistics of the new rows into the running ones in O(new rows)
+        self.decay(time.time() if now is None else now)
+        if len(y) == 0:
+            return self
+        X = np.asarray(X, dtype=np.float64).reshape(len(y), -1)
+        y = np.asarray(y, dtype=np.float64)
+
+        batch_mean_x = X.mean(axis=0)
+        batch_mean_y = y.mean()
+        centered_x = X - batch_mean_x
+        centered_y = y - batch_mean_y
+
+        weight = self.weight + len(y)
+        delta_x = batch_mean_x - self.mean_x
+        delta_y = batch_mean_y - self.mean_y
+        share = self.weight * len(y) / weight
+        self.cov_xx += centered_x.T @ centered_x + np.outer(delta_x, delta_x) * share
+        self.cov_xy += centered_x.T @ centered_y + delta_x * delta_y * share
+        self.mean_x += delta_x * len(y) / weight
+        self.mean_y += delta_y * len(y) / weight
+        self.weight = weight
+        return self
+
+    def update_from_assessments(self, risk_assessments, transactions_by_id, now=None):
+        # New assessments joined to their transactions through the ID index, without a merge
+        rows = [(transactions_by_id[risk_assessment.transaction_id].amount, risk_assessment.risk_score)
+                for risk_assessment in risk_assessments if risk_assessment.transaction_id in transactions_by_id]
+        amounts, scores = zip(*rows) if rows else ((), ())
+        return self.update(np.array(amounts, dtype=np.float64).reshape(-1, 1), scores, now)
+
+    @property
+    def coef_(self):
+        return np.linalg.lstsq(self.cov_xx, self.cov_xy, rcond=None)[0]
+
+    @property
+    def intercept_(self):
+        return self.mean_y - self.mean_x @ self.coef_
+
+    def to_scorer(self):
+        return LinearRiskScorer(self.coef_, self.intercept_, self.feature_names)
+
+    def predict(self, X):
+        return self.to_scorer().predict(X)
+
+    def save(self, path=MODEL_STATS_PATH):
+        state = {'feature_names': self.feature_names, 'half_life': self.half_life, 'weight': self.weight,
+                 'mean_x': self.mean_x.tolist(), 'mean_y': self.mean_y, 'cov_xx': self.cov_xx.tolist(),
+                 'cov_xy': self.cov_xy.tolist(), 'updated_at': self.updated_at}
+        with open(path + '.tmp', 'w') as f:
+            json.dump(state, f)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, path=MODEL_STATS_PATH):
+        with open(path) as f:
+            state = json.load(f)
+        model = cls(state['feature_names'], state['half_life'])
+        model.weight = state['weight']
+        model.mean_x = np.array(state['mean_x'])
+        model.mean_y = state['mean_y']
+        model.cov_xx = np.array(state['cov_xx'])
+        model.cov_xy = np.array(state['cov_xy'])
+        model.updated_at = state['updated_at']
+        return model
+
+def train_incremental_risk_model(risk_assessment_df, transactions_df, half_life=None):
+    # Same merge as train_risk_model, used once to seed the statistics from the full history
+    df = pd.merge(risk_assessment_df, transactions_df, on='TransactionID')
+    return IncrementalRiskModel(half_life=half_life).update(df[['Amount']], df['RiskScore'])
+
+# 14. Fingerprint the Training Data
+def file_fingerprint(path, content_hash=True):
+    stat = os.stat(path)
+    fingerprint = {'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if content_hash:
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha256.update(block)
+        fingerprint['sha256'] = sha256.hexdigest()
+    return fingerprint
+
+def data_version(paths=None):
+    # Cheap (path, size, mtime) key for in-process caches; no file contents are read
+    paths = paths or training_data_paths()
+    return tuple((f['path'], f['size'], f['mtime_ns']) for f in
+                 (file_fingerprint(path, content_hash=False) for path in paths))
+
+# 15. Load the Persisted Risk Model, Retraining Only When the Inputs Change
+@METRICS.timer('load_or_train_risk_model')
+def load_or_train_risk_model(artifact_path=None, paths=None, features=False):
+    # features=True trains on the finansial_features columns; score it with score_batch(feature_store=...)
+    artifact_path = artifact_path or (FEATURE_MODEL_ARTIFACT_PATH if features else MODEL_ARTIFACT_PATH)
+    feature_names = FEATURE_NAMES if features else ['Amount']
+    paths = paths or training_data_paths()
+    artifact = None
+    if os.path.exists(artifact_path):
+        with open(artifact_path) as f:
+            artifact = json.load(f)
+        if artifact.get('version') != MODEL_ARTIFACT_VERSION or \
+                [stored['path'] for stored in artifact['inputs']] != list(paths) or \
+                artifact['model']['feature_names'] != feature_names:
+            artifact = None
+
+    if artifact is not None:
+        # Unchanged size and mtime: trust the stored content hash without re-reading the files
+        current = [file_fingerprint(path, content_hash=False) for path in paths]
+        if all(stored['size'] == f['size'] and stored['mtime_ns'] == f['mtime_ns']
+               for stored, f in zip(artifact['inputs'], current)):
+            return LinearRiskScorer.from_dict(artifact['model'])
+
+    # Files were touched (or there is no artifact): compare contents before refitting
+    fingerprints = [file_fingerprint(path) for path in paths]
+    if artifact is None or any(stored['sha256'] != f['sha256']
+                               for stored, f in zip(artifact['inputs'], fingerprints)):
+        model = train_risk_model(*load_training_data(paths, features),
+                                 feature_store=FeatureStore() if features else None)
+        scorer = LinearRiskScorer.from_model(model)
+    else:
+        scorer = LinearRiskScorer.from_dict(artifact['model'])
+
+    # Write atomically so a concurrent reader never sees a partial artifact
+    artifact = {'version': MODEL_ARTIFACT_VERSION, 'inputs': fingerprints, 'model': scorer.to_dict()}
+    with open(artifact_path + '.tmp', 'w') as f:
+        json.dump(artifact, f)
+    os.replace(artifact_path + '.tmp', artifact_path)
+    return scorer
+
+# 16. Score a Batch of Transactions with a Single Model Call
+@METRICS.timer('score_batch')
+def score_batch(model, transactions, threshold=None, feature_store=None):
+    # Accepts Transaction objects or an array of amounts; a feature store needs Transaction objects
+    if threshold is None:
+        threshold = RISK_THRESHOLD
+    if len(transactions) == 0:
+        return np.empty(0), np.empty(0, dtype=bool)
+
+    if feature_store is None and len(model.coef_) > 1:
+        raise ValueError("A multi-feature model needs the feature_store it is served with")
+
+    # One vectorized predict, with the same column names the model was trained on
+    scores = model.predict(feature_frame(transactions, feature_store))
+    return scores, scores > threshold
+
+@METRICS.timer('score_batch.dataframe')
+def feature_frame(transactions, feature_store=None):
+    if feature_store is not None:
+        return pd.DataFrame(feature_store.transaction_features(transactions), columns=feature_store.feature_names)
+    amounts = np.asarray(transactions)
+    if amounts.dtype == object:
+        amounts = np.array([transaction.amount for transaction in transactions], dtype=float)
+    return pd.DataFrame({'Amount': amounts})
+
+# 17. Simulate Risk Prediction for New Loan Request
 def predict_risk(model, new_transaction):
     # Use the transaction amount as input to predict risk score
-    predicted_risk = model.predict(np.array([[new_transaction.amount]]))[0]
+    scores, risky = score_batch(model, [new_transaction])
+    predicted_risk = scores[0]
     print(f"Predicted Risk Score for Transaction {new_transaction.transaction_id}: {predicted_risk:.2f}")
     
-    # Simulate whether the loan is risky or not based on a threshold (e.g., >0.5 is risky)
-    if predicted_risk > 0.5:
+    # Simulate whether the loan is risky or not based on RISK_THRESHOLD
+    if risky[0]:
         print(f"Transaction {new_transaction.transaction_id} is risky!")
     else:
         print(f"Transaction {new_transaction.transaction_id} is not risky.")
+    return predicted_risk
 
-# 10. Simulate the Complete Process (With Risk Prediction for New Loans)
+# 18. Simulate the Complete Process (With Risk Prediction for New Loans)
 def run_simulation():
     companies, customers, transactions, risk_assessments = initialize_entities()
     link_risk_assessments_to_transactions(transactions, risk_assessments)
     
-    # Train the risk prediction model on historical data
-    model = train_risk_model(risk_assessment_df, transactions_df)
+    # Train the risk prediction model on historical data and serve it without sklearn
+    model = LinearRiskScorer.from_model(train_risk_model(*load_training_data()))
     
     # Link the trained model to RiskAssessment class instances
     for risk_assessment in risk_assessments:
@@ -163,24 +675,20 @@ def run_simulation():
     # Simulate new transactions and their risk assessments (Reduced number of new transactions)
     new_transactions = simulate_new_transactions(customers, companies)
     
-    # Predict risk for new transactions and add risk assessment
-    for new_transaction in new_transactions:
-        # Create a new risk assessment with a placeholder risk score
+    # Predict risk for all new transactions at once
+    scores, risky = score_batch(model, new_transactions)
+    
+    # Add a risk assessment for each new transaction
+    for new_transaction, predicted_risk, is_risky in zip(new_transactions, scores, risky):
         risk_assessment = RiskAssessment(
             assessment_id=f"RA{random.randint(1000, 9999)}",
-            risk_score=0,  # Placeholder for risk score
+            risk_score=predicted_risk,
             customer_id=new_transaction.customer_id,
             transaction_id=new_transaction.transaction_id,
             timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             model=model  # Provide model for risk prediction
         )
         
-        # Use the model to predict risk score
-        predicted_risk = risk_assessment.predict_risk(new_transaction.amount)
-        
-        # Add the predicted risk score to the risk assessment
-        risk_assessment.risk_score = predicted_risk
-        
         # Link the risk assessment to the transaction
         new_transaction.add_risk_assessment(risk_assessment)
 
@@ -188,10 +696,11 @@ def run_simulation():
         print(f"Risk prediction added for Transaction {new_transaction.transaction_id}: {predicted_risk:.2f}")
         
         # Simulate whether the loan is risky or not based on predicted risk score
-        if predicted_risk > 0.73:
+        if is_risky:
             print(f"Transaction {new_transaction.transaction_id} is risky!")
         else:
             print(f"Transaction {new_transaction.transaction_id} is not risky.")
 
 # Run the simulation
-run_simulation()
\ No newline at end of file
+if __name__ == '__main__':
+    run_simulation()
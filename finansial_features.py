@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+# Features produced for each transaction, in column order
+FEATURE_NAMES = ['Amount', 'CustomerTxnCount', 'CustomerAvgAmount', 'CustomerRecentSpend', 'CompanyAvgAmount']
+
+def to_seconds(timestamps):
+    # Accepts datetime64 values or timestamp strings; datetime64 arrays skip the parser
+    values = np.asarray(timestamps)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[us]').astype(np.int64) / 1e6
+    return pd.to_datetime(pd.Series(timestamps), format='ISO8601').to_numpy('datetime64[us]').astype(np.int64) / 1e6
+
+# 1. Per-Customer and Per-Company Aggregates in Arrays Indexed by ID
+class FeatureStore:
+    def __init__(self, n_customers=0, n_companies=0, half_life_days=30.0):
+        self.feature_names = FEATURE_NAMES
+        self.half_life = half_life_days * 86400.0
+        self.customer_count = np.zeros(n_customers + 1, dtype=np.int64)
+        self.customer_total = np.zeros(n_customers + 1)
+        self.customer_recent = np.zeros(n_customers + 1)  # Spend decayed by half_life up to customer_last_seen
+        self.customer_last_seen = np.zeros(n_customers + 1)
+        self.company_count = np.zeros(n_companies + 1, dtype=np.int64)
+        self.company_total = np.zeros(n_companies + 1)
+
+    def _grow(self, customer_max, company_max):
+        # IDs index the arrays directly; grow geometrically when a larger ID shows up
+        if customer_max >= len(self.customer_count):
+            size = max(customer_max + 1, 2 * len(self.customer_count))
+            for name in ('customer_count', 'customer_total', 'customer_recent', 'customer_last_seen'):
+                array = getattr(self, name)
+                setattr(self, name, np.concatenate([array, np.zeros(size - len(array), dtype=array.dtype)]))
+        if company_max >= len(self.company_count):
+            size = max(company_max + 1, 2 * len(self.company_count))
+            for name in ('company_count', 'company_total'):
+                array = getattr(self, name)
+                setattr(self, name, np.concatenate([array, np.zeros(size - len(array), dtype=array.dtype)]))
+
+    def update(self, customer_ids, company_ids, amounts, timestamps):
+        # Folds a batch of new transactions into the aggregates in O(batch)
+        return self._update(np.asarray(customer_ids, dtype=np.int64), np.asarray(company_ids, dtype=np.int64),
+                            np.asarray(amounts, dtype=np.float64), to_seconds(timestamps))
+
+    def _update(self, customer_ids, company_ids, amounts, seconds):
+        if len(amounts) == 0:
+            return self
+        self._grow(customer_ids.max(), company_ids.max())
+
+        np.add.at(self.customer_count, customer_ids, 1)
+        np.add.at(self.customer_total, customer_ids, amounts)
+        np.add.at(self.company_count, company_ids, 1)
+        np.add.at(self.company_total, company_ids, amounts)
+
+        # Decay each touched customer's recent spend to its newest transaction, then add the batch
+        latest = self.customer_last_seen.copy()
+        np.maximum.at(latest, customer_ids, seconds)
+        touched = np.unique(customer_ids)
+        self.customer_recent[touched] *= 0.5 ** ((latest[touched] - self.customer_last_seen[touched]) / self.half_life)
+        self.customer_last_seen[touched] = latest[touched]
+        np.add.at(self.customer_recent, customer_ids,
+                  amounts * 0.5 ** ((latest[customer_ids] - seconds) / self.half_life))
+        return self
+
+    def update_transactions(self, transactions):
+        return self.update([transaction.customer_id for transaction in transactions],
+                           [transaction.company_id for transaction in transactions],
+                           [transaction.amount for transaction in transactions],
+                           [transaction.timestamp for transaction in transactions])
+
+    def _recent_at(self, customer_ids, seconds):
+        # Recent spend decayed from each customer's last transaction to the given times
+        elapsed = np.maximum(seconds - self.customer_last_seen[customer_ids], 0)
+        return self.customer_recent[customer_ids] * 0.5 ** (elapsed / self.half_life)
+
+    def features(self, customer_ids, company_ids, amounts, timestamps):
+        # Gathers the aggregates for each row at its timestamp, O(1) per transaction
+        customer_ids = np.asarray(customer_ids, dtype=np.int64)
+        company_ids = np.asarray(company_ids, dtype=np.int64)
+        self._grow(customer_ids.max(initial=0), company_ids.max(initial=0))
+        customer_count = self.customer_count[customer_ids]
+        company_count = self.company_count[company_ids]
+        return np.column_stack([
+            np.asarray(amounts, dtype=np.float64),
+            customer_count,
+            self.customer_total[customer_ids] / np.maximum(customer_count, 1),
+            self._recent_at(customer_ids, to_seconds(timestamps)),
+            self.company_total[company_ids] / np.maximum(company_count, 1),
+        ])
+
+    def transaction_features(self, transactions):
+        return self.features([transaction.customer_id for transaction in transactions],
+                             [transaction.company_id for transaction in transactions],
+                             [transaction.amount for transaction in transactions],
+                             [transaction.timestamp for transaction in transactions])
+
+    def _features_before(self, customer_ids, company_ids, amounts, seconds):
+        # Rows in time order; each sees the store plus the rows before it in the batch, but not itself
+        self._grow(customer_ids.max(), company_ids.max())
+        customers, companies = pd.Series(customer_ids), pd.Series(company_ids)
+        customer_count = self.customer_count[customer_ids] + customers.groupby(customers).cumcount().to_numpy()
+        customer_total = self.customer_total[customer_ids] + \
+            pd.Series(amounts).groupby(customers).cumsum().to_numpy() - amounts
+        company_count = self.company_count[company_ids] + companies.groupby(companies).cumcount().to_numpy()
+        company_total = self.company_total[company_ids] + \
+            pd.Series(amounts).groupby(companies).cumsum().to_numpy() - amounts
+
+        # Earlier rows of the batch decay to each row's time; weights are relative to the batch start so the
+        # exponent stays within float range for batches spanning under ~1000 half-lives
+        growth = 2.0 ** ((seconds - seconds[0]) / self.half_life)
+        weighted = amounts * growth
+        earlier = pd.Series(weighted).groupby(customers).cumsum().to_numpy() - weighted
+        return np.column_stack([
+            amounts,
+            customer_count,
+            customer_total / np.maximum(customer_count, 1),
+            self._recent_at(customer_ids, seconds) + np.maximum(earlier, 0) / growth,
+            company_total / np.maximum(company_count, 1),
+        ])
+
+    def point_in_time_features(self, transactions_df, chunk_size=1000000):
+        # Each row's features as they stood just before it, as live scoring would see them, for training.
+        # The rows are folded into the store in time order along the way; returned in the frame's row order
+        seconds = to_seconds(transactions_df['Timestamp'])
+        order = np.argsort(seconds, kind='stable')
+        seconds = seconds[order]
+        customer_ids = transactions_df['CustomerID'].to_numpy(np.int64)[order]
+        company_ids = transactions_df['CompanyID'].to_numpy(np.int64)[order]
+        amounts = transactions_df['Amount'].to_numpy(np.float64)[order]
+
+        features = np.empty((len(transactions_df), len(self.feature_names)))
+        for start in range(0, len(transactions_df), chunk_size):
+            rows = slice(start, start + chunk_size)
+            features[order[rows]] = self._features_before(customer_ids[rows], company_ids[rows], amounts[rows],
+                                                          seconds[rows])
+            self._update(customer_ids[rows], company_ids[rows], amounts[rows], seconds[rows])
+        return features
+
+    @classmethod
+    def from_frame(cls, transactions_df, chunk_size=1000000, half_life_days=30.0):
+        store = cls(int(transactions_df['CustomerID'].max()), int(transactions_df['CompanyID'].max()), half_life_days)
+        for start in range(0, len(transactions_df), chunk_size):
+            chunk = transactions_df.iloc[start:start + chunk_size]
+            store.update(chunk['CustomerID'], chunk['CompanyID'], chunk['Amount'], chunk['Timestamp'])
+        return store
+
+    def save(self, path):
+        np.savez(path, half_life=self.half_life, customer_count=self.customer_count,
+                 customer_total=self.customer_total, customer_recent=self.customer_recent,
+                 customer_last_seen=self.customer_last_seen, company_count=self.company_count,
+                 company_total=self.company_total)
+
+    @classmethod
+    def load(cls, path):
+        store = cls()
+        with np.load(path) as arrays:
+            store.half_life = float(arrays['half_life'])
+            for name in ('customer_count', 'customer_total', 'customer_recent', 'customer_last_seen',
+                         'company_count', 'company_total'):
+                setattr(store, name, arrays[name])
+        return store
@@ -1,7 +1,12 @@
+import argparse
+import os
+import time
 import pandas as pd
+import numpy as np
 import random
 import hashlib
 from datetime import datetime
+from finansial_hash import hash_fields, make_pool
 
 # Set the seed for reproducibility
 random.seed(42)
@@ -111,11 +116,122 @@ def save_data_to_csv(companies, customers, transactions, risk_assessments):
                                                                       "CustomerID", "TransactionID"])
     risk_assessment_df.to_csv('risk_assessment.csv', index=False)
 
-# Generate data
-companies, customers, transactions, risk_assessments = generate_data()
-
-# Save the generated data to CSV
-save_data_to_csv(companies, customers, transactions, risk_assessments)
-
-# Paths to saved CSV files
-('companies.csv', 'customers.csv', 'transactions.csv', 'risk_assessment.csv')
\ No newline at end of file
+# 7. Write Chunks of a Dataset to CSV and/or Parquet
+class ChunkWriter:
+    def __init__(self, directory, name, formats):
+        self.csv_path = os.path.join(directory, f"{name}.csv") if 'csv' in formats else None
+        self.parquet_path = os.path.join(directory, f"{name}.parquet") if 'parquet' in formats else None
+        self.parquet_writer = None
+        self.rows = 0
+
+    def write(self, df, csv_df=None):
+        # csv_df lets a chunk use preformatted text columns in the CSV output
+        if self.csv_path:
+            (df if csv_df is None else csv_df).to_csv(self.csv_path, mode='w' if self.rows == 0 else 'a',
+                                                      header=self.rows == 0, index=False)
+        if self.parquet_path:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.parquet_path, table.schema)
+            self.parquet_writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+# 8. Stream a Large Synthetic Dataset to Disk with Bounded Memory
+METHODS = ['Credit', 'Debit', 'Transfer']
+
+def format_timestamps(timestamps):
+    # Same text as str(datetime), always with microseconds, so the hashed string matches the CSV
+    return np.char.replace(np.datetime_as_string(timestamps, unit='us'), 'T', ' ')
+
+def generate_dataset(n_transactions, n_customers=100, n_companies=10, n_assessments=None, directory='.',
+                     formats=('csv',), chunk_size=1000000, seed=42, start='2024-12-11 00:00:00', mean_gap_seconds=1.0,
+                     workers=None):
+    # The same seed and chunk_size always produce the same files
+    rng = np.random.default_rng(seed)
+    n_assessments = n_transactions // 10 if n_assessments is None else n_assessments
+    started = time.perf_counter()
+    writers = {name: ChunkWriter(directory, name, formats)
+               for name in ('companies', 'customers', 'transactions', 'risk_assessment')}
+    # One hashing pool for the whole run rather than one per chunk
+    pool = make_pool(workers) if workers != 1 else None
+
+    # Companies and customers, also in chunks so 10^7 customers stay bounded
+    for name, id_column, prefix, count in (('companies', 'CompanyID', 'Company', n_companies),
+                                           ('customers', 'CustomerID', 'Customer', n_customers)):
+        for first in range(1, count + 1, chunk_size):
+            ids = np.arange(first, min(first + chunk_size, count + 1))
+            id_text = ids.astype(str).astype(object)
+            chunk = {id_column: ids, 'Name': f"{prefix} " + id_text}
+            if name == 'customers':
+                chunk['Phone'] = "Phone " + id_text
+            chunk['Address'] = "Address " + id_text
+            writers[name].write(pd.DataFrame(chunk))
+
+    # Transactions, with the assessments for each chunk drawn from that chunk
+    timestamp = np.datetime64(start, 'us')
+    mean_gap_us = int(mean_gap_seconds * 1e6)
+    for first in range(0, n_transactions, chunk_size):
+        size = min(chunk_size, n_transactions - first)
+        ids = np.arange(first + 1, first + size + 1)
+        amounts = rng.integers(1000, 5001, size)
+        methods = pd.Categorical.from_codes(rng.integers(0, len(METHODS), size), categories=METHODS)
+        customer_ids = rng.integers(1, n_customers + 1, size)
+        company_ids = rng.integers(1, n_companies + 1, size)
+        timestamps = timestamp + np.cumsum(rng.integers(1, 2 * mean_gap_us, size)).astype('timedelta64[us]')
+        timestamp = timestamps[-1]
+
+        timestamp_text = format_timestamps(timestamps)
+        hashes = hash_fields(ids.tolist(), amounts.tolist(), timestamp_text.tolist(), pool=pool)
+        chunk = pd.DataFrame({'TransactionID': ids, 'Amount': amounts, 'Method': methods, 'CustomerID': customer_ids,
+                              'CompanyID': company_ids, 'Timestamp': timestamps, 'Hash': hashes})
+        writers['transactions'].write(chunk, chunk.assign(Timestamp=timestamp_text))
+
+        # Spread the assessments over the chunks in proportion to their size
+        count = n_assessments * (first + size) // n_transactions - n_assessments * first // n_transactions
+        rows = rng.integers(0, size, count)
+        assessment_ids = np.arange(writers['risk_assessment'].rows + 1, writers['risk_assessment'].rows + count + 1)
+        assessed = timestamps[rows] + rng.integers(0, 1000000, count).astype('timedelta64[us]')
+        assessments = pd.DataFrame({'AssessmentID': assessment_ids, 'RiskScore': rng.uniform(0.5, 0.9, count),
+                                    'Timestamp': assessed, 'CustomerID': customer_ids[rows], 'TransactionID': ids[rows]})
+        writers['risk_assessment'].write(assessments, assessments.assign(Timestamp=format_timestamps(assessed)))
+
+    if pool is not None:
+        pool.shutdown()
+    for writer in writers.values():
+        writer.close()
+    elapsed = time.perf_counter() - started
+    rows = {name: writer.rows for name, writer in writers.items()}
+    return {'rows': rows, 'seconds': elapsed, 'rows_per_second': sum(rows.values()) / elapsed}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate synthetic finansial datasets")
+    parser.add_argument('--transactions', type=int, help="stream this many transactions instead of the small demo set")
+    parser.add_argument('--customers', type=int, default=100)
+    parser.add_argument('--companies', type=int, default=10)
+    parser.add_argument('--assessments', type=int)
+    parser.add_argument('--format', nargs='+', choices=['csv', 'parquet'], default=['csv'])
+    parser.add_argument('--chunk-size', type=int, default=1000000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--directory', default='.')
+    parser.add_argument('--workers', type=int, help="hashing processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    if args.transactions is None:
+        # Generate data
+        companies, customers, transactions, risk_assessments = generate_data()
+
+        # Save the generated data to CSV
+        save_data_to_csv(companies, customers, transactions, risk_assessments)
+    else:
+        report = generate_dataset(args.transactions, args.customers, args.companies, args.assessments,
+                                  args.directory, args.format, args.chunk_size, args.seed, workers=args.workers)
+        for name, count in report['rows'].items():
+            print(f"{name}: {count} rows")
+        print(f"Wrote {sum(report['rows'].values())} rows in {report['seconds']:.2f}s "
+              f"({report['rows_per_second']:.0f} rows/s)")
@@ -0,0 +1,191 @@
+import argparse
+import contextlib
+import fcntl
+import hashlib
+import os
+import struct
+import threading
+import numpy as np
+import pandas as pd
+
+from finansial_ekosistem import Transaction
+
+# Default ledger file, next to the CSV files
+LEDGER_PATH = 'ledger.bin'
+
+# File header: magic, format version and record size, padded to HEADER_SIZE bytes
+MAGIC = b'FNLEDGER'
+LEDGER_VERSION = 2
+HEADER_SIZE = 64
+
+# Fixed-width record; transaction_hash is the transaction's own Hash, as in transactions.csv, and chain_hash
+# covers the previous record's chain_hash followed by this record's payload
+RECORD_DTYPE = np.dtype([('transaction_id', 'S16'), ('amount', '<f8'), ('method', 'S8'), ('customer_id', '<i8'),
+                         ('company_id', '<i8'), ('timestamp', '<i8'), ('transaction_hash', 'u1', (32,)),
+                         ('chain_hash', 'u1', (32,))])
+PAYLOAD_SIZE = RECORD_DTYPE.itemsize - 32
+GENESIS_HASH = bytes(32)
+
+def encode_text(values, field):
+    # Fixed-width fields would silently cut longer values, so those are rejected instead
+    width = RECORD_DTYPE[field].itemsize
+    encoded = [str(value).encode('ascii') for value in values]
+    for value in encoded:
+        if len(value) > width:
+            raise ValueError(f"{field} {value.decode()!r} does not fit in {width} bytes")
+    return encoded
+
+def decode_digests(hashes):
+    digests = []
+    for value in hashes:
+        try:
+            digest = bytes.fromhex(value)
+        except (TypeError, ValueError):
+            digest = b''
+        if len(digest) != 32:
+            raise ValueError(f"Hash {value!r} is not a hex SHA-256 digest")
+        digests.append(digest)
+    return np.frombuffer(b''.join(digests), dtype=np.uint8).reshape(-1, 32)
+
+# 1. Append-Only Ledger File with Hash-Chained Records
+class Ledger:
+    def __init__(self, path=LEDGER_PATH, mode='a'):
+        # mode 'r' never writes to the file; mode 'a' creates it if needed and may append
+        if mode not in ('r', 'a'):
+            raise ValueError(f"mode must be 'r' or 'a', not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.lock = threading.Lock()  # flock does not exclude threads sharing one file, so also lock in-process
+        self.file = None
+        if mode == 'r':
+            self._check_header()
+            return
+
+        self.file = open(path, 'ab+')
+        try:
+            with self._write_lock():
+                if os.fstat(self.file.fileno()).st_size == 0:
+                    self.file.write(struct.pack('<8sII', MAGIC, LEDGER_VERSION,
+                                                RECORD_DTYPE.itemsize).ljust(HEADER_SIZE, b'\0'))
+                    self.file.flush()
+            self._check_header()
+        except BaseException:
+            # Not a ledger this version can append to; do not keep the handle open
+            self.file.close()
+            raise
+
+    def _check_header(self):
+        with open(self.path, 'rb') as f:
+            header = f.read(16)
+        if len(header) < 16 or struct.unpack('<8sII', header) != (MAGIC, LEDGER_VERSION, RECORD_DTYPE.itemsize):
+            raise ValueError(f"{self.path} is not a version {LEDGER_VERSION} ledger")
+
+    @contextlib.contextmanager
+    def _write_lock(self):
+        # Exclusive across processes and threads for the whole read-tail, write sequence
+        with self.lock:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+
+    def __len__(self):
+        # A record still being written by another process is not counted
+        return max(os.path.getsize(self.path) - HEADER_SIZE, 0) // RECORD_DTYPE.itemsize
+
+    def append(self, transactions, sync=False):
+        if self.mode != 'a':
+            raise ValueError(f"{self.path} was opened read-only")
+        records = np.zeros(len(transactions), dtype=RECORD_DTYPE)
+        records['transaction_id'] = encode_text([transaction.transaction_id for transaction in transactions],
+                                                'transaction_id')
+        records['amount'] = [transaction.amount for transaction in transactions]
+        records['method'] = encode_text([transaction.method for transaction in transactions], 'method')
+        records['customer_id'] = [transaction.customer_id for transaction in transactions]
+        records['company_id'] = [transaction.company_id for transaction in transactions]
+        records['timestamp'] = pd.to_datetime(pd.Series([transaction.timestamp for transaction in transactions]),
+                                              format='ISO8601').to_numpy('datetime64[us]').astype(np.int64)
+        records['transaction_hash'] = decode_digests([transaction.hash for transaction in transactions])
+        data = bytearray(records.tobytes())
+        with self._write_lock():
+            # Every writer holds the lock while writing, so a partial record here was left by a crash
+            size = os.fstat(self.file.fileno()).st_size
+            complete = HEADER_SIZE + (size - HEADER_SIZE) // RECORD_DTYPE.itemsize * RECORD_DTYPE.itemsize
+            if complete != size:
+                self.file.truncate(complete)
+
+            # Chain from the file's current tail, which another writer may have moved
+            if complete > HEADER_SIZE:
+                self.file.seek(complete - 32)
+                previous = self.file.read(32)
+            else:
+                previous = GENESIS_HASH
+            for start in range(0, len(data), RECORD_DTYPE.itemsize):
+                payload_end = start + PAYLOAD_SIZE
+                previous = hashlib.sha256(previous + data[start:payload_end]).digest()
+                data[payload_end:payload_end + 32] = previous
+            self.file.write(data)  # Opened for appending, so this lands at the end
+            self.file.flush()
+            if sync:
+                os.fsync(self.file.fileno())
+
+    def records(self, start=0, stop=None):
+        # Zero-copy view of the records through a memory map; nothing is parsed
+        count = len(self)
+        stop = count if stop is None else min(stop, count)
+        if start >= stop:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return np.memmap(self.path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE + start * RECORD_DTYPE.itemsize,
+                         shape=(stop - start,))
+
+    def verify(self, block_size=1000000):
+        # One streaming pass; returns the index of the first broken record, or None if the chain is intact
+        previous = GENESIS_HASH
+        count = len(self)
+        for start in range(0, count, block_size):
+            data = self.records(start, start + block_size).tobytes()
+            for offset in range(0, len(data), RECORD_DTYPE.itemsize):
+                payload_end = offset + PAYLOAD_SIZE
+                expected = hashlib.sha256(previous + data[offset:payload_end]).digest()
+                previous = data[payload_end:payload_end + 32]
+                if expected != previous:
+                    return start + offset // RECORD_DTYPE.itemsize
+        return None
+
+    def to_frame(self, start=0, stop=None):
+        # Columns in the transactions.csv layout, for the requested slice only
+        records = self.records(start, stop)
+        transaction_ids = np.char.decode(records['transaction_id'], 'ascii').tolist()
+        return pd.DataFrame({
+            'TransactionID': [int(value) if value.isdigit() else value for value in transaction_ids],
+            'Amount': records['amount'],
+            'Method': np.char.decode(records['method'], 'ascii'),
+            'CustomerID': records['customer_id'],
+            'CompanyID': records['company_id'],
+            'Timestamp': records['timestamp'].astype('datetime64[us]'),
+            'Hash': [bytes(digest).hex() for digest in records['transaction_hash']],
+            'ChainHash': [bytes(digest).hex() for digest in records['chain_hash']],
+        })
+
+    def transactions(self, start=0, stop=None):
+        df = self.to_frame(start, stop)
+        return [Transaction(*row) for row in zip(*(df[column].tolist() for column in
+                                                   ['TransactionID', 'Amount', 'Method', 'CustomerID', 'CompanyID',
+                                                    'Timestamp', 'Hash']))]
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Inspect and verify a transaction ledger")
+    parser.add_argument('path', nargs='?', default=LEDGER_PATH)
+    parser.add_argument('--tail', type=int, default=10, help="records to print from the end")
+    args = parser.parse_args()
+
+    ledger = Ledger(args.path, mode='r')
+    count = len(ledger)
+    broken = ledger.verify()
+    print(f"{count} records; " + ("hash chain intact" if broken is None else f"hash chain broken at record {broken}"))
+    print(ledger.to_frame(max(count - args.tail, 0)).to_string(index=False))
@@ -0,0 +1,106 @@
+import collections
+import contextlib
+import functools
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# Collection is switched on for the whole process with FINANSIAL_METRICS=1
+METRICS_PATH = 'finansial_metrics.json'
+
+# 1. Per-Stage Timers and Counters, Checked Against One Flag When Disabled
+class _Stage:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.metrics.record(self.name, time.perf_counter() - self.start)
+
+NO_STAGE = contextlib.nullcontext()
+
+class Metrics:
+    def __init__(self, enabled=False, window=10000):
+        self.enabled = enabled
+        self.window = window
+        self.samples = collections.defaultdict(lambda: collections.deque(maxlen=window))  # Seconds, latest only
+        self.counters = collections.Counter()
+
+    def record(self, name, seconds):
+        self.samples[name].append(seconds)
+        self.counters[name] += 1
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] += n
+
+    def timer(self, name):
+        # Decorator; when disabled the only cost is the flag check and one extra call
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def stage(self, name):
+        # Context manager form of timer, for blocks that are not whole functions; a shared no-op when disabled
+        return _Stage(self, name) if self.enabled else NO_STAGE
+
+    def reset(self):
+        self.samples.clear()
+        self.counters.clear()
+
+    def summary(self):
+        rows = []
+        for name, samples in sorted(self.samples.items()):
+            milliseconds = np.fromiter(samples, dtype=float) * 1000
+            p50, p99 = np.percentile(milliseconds, [50, 99])
+            rows.append({'stage': name, 'calls': self.counters[name], 'mean_ms': milliseconds.mean(),
+                         'p50_ms': p50, 'p99_ms': p99, 'max_ms': milliseconds.max()})
+        return pd.DataFrame(rows, columns=['stage', 'calls', 'mean_ms', 'p50_ms', 'p99_ms', 'max_ms'])
+
+    def histogram(self, name, bins=20):
+        # Counts per latency bucket, labelled by the bucket's upper edge in milliseconds
+        counts, edges = np.histogram(np.fromiter(self.samples[name], dtype=float) * 1000, bins=bins)
+        return pd.DataFrame({'calls': counts}, index=pd.Index(edges[1:], name='ms'))
+
+    def cache_hit_rates(self):
+        # A cached stage counts "<name>.calls" on every lookup and is timed only when it misses
+        rates = {}
+        for key, calls in self.counters.items():
+            if key.endswith('.calls') and calls:
+                name = key[:-len('.calls')]
+                rates[name] = 1 - min(self.counters[name], calls) / calls
+        return rates
+
+    def export(self, path=METRICS_PATH):
+        report = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'stages': self.summary().to_dict('records'),
+            'cache_hit_rates': self.cache_hit_rates(),
+            'counters': dict(self.counters),
+            'samples_seconds': {name: list(samples) for name, samples in self.samples.items()},
+        }
+        # Write to a temporary file first so a reader never sees a half-written export
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        os.replace(temporary_path, path)
+        return path
+
+# Shared by every module in the process
+METRICS = Metrics(enabled=os.environ.get('FINANSIAL_METRICS') == '1')
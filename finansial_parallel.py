@@ -0,0 +1,150 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+from finansial_ekosistem import RISK_THRESHOLD, LinearRiskScorer, load_or_train_risk_model
+from finansial_storage import read_dataset
+
+# 1. Share NumPy Arrays Between Processes Without Pickling Them
+class SharedArrays:
+    def __init__(self, arrays):
+        # Copies each array once into its own shared memory block
+        self.blocks = {}
+        self.spec = {}
+        for name, array in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            self.blocks[name] = block
+            self.spec[name] = (block.name, array.dtype.str, array.shape)
+
+    def array(self, name):
+        block = self.blocks[name]
+        _, dtype, shape = self.spec[name]
+        return np.ndarray(shape, dtype, buffer=block.buf)
+
+    def close(self):
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+
+def attach(spec):
+    blocks, arrays = [], {}
+    for name, (block_name, dtype, shape) in spec.items():
+        # Pool workers share the parent's resource tracker, so the parent's unlink covers these too
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype, buffer=block.buf)
+    return blocks, arrays
+
+# 2. Score and Aggregate One Shard of Customer IDs
+def _summarize_shard(inputs_spec, outputs_spec, start, stop, low, high, scorer, threshold, n_companies):
+    # Rows [start, stop) of the shared arrays are exactly the rows of customers [low, high)
+    input_blocks, inputs = attach(inputs_spec)
+    output_blocks, outputs = attach(outputs_spec)
+    customer_ids = company_ids = None  # Bound up front so the cleanup below cannot hide an earlier error
+    try:
+        customer_ids = inputs['CustomerID'][start:stop]
+        amounts = inputs['Amount'][start:stop].astype(np.float64)
+        scores = LinearRiskScorer.from_dict(scorer).predict(amounts)
+        risky = scores > threshold
+
+        # Customers in [low, high) belong to this shard only, so it writes their slice directly
+        local = customer_ids - low
+        size = high - low
+        outputs['customer_count'][low:high] = np.bincount(local, minlength=size)
+        outputs['customer_amount'][low:high] = np.bincount(local, amounts, size)
+        outputs['customer_score'][low:high] = np.bincount(local, scores, size)
+        outputs['customer_risky'][low:high] = np.bincount(local, risky, size)
+        customer_max = np.full(size, np.nan)
+        np.fmax.at(customer_max, local, scores)
+        outputs['customer_max_score'][low:high] = customer_max
+
+        # Companies span every shard; their partial sums are small enough to return
+        company_ids = inputs['CompanyID'][start:stop]
+        return np.stack([np.bincount(company_ids, minlength=n_companies + 1),
+                         np.bincount(company_ids, amounts, n_companies + 1),
+                         np.bincount(company_ids, scores, n_companies + 1),
+                         np.bincount(company_ids, risky, n_companies + 1)])
+    finally:
+        del inputs, outputs, customer_ids, company_ids
+        for block in input_blocks + output_blocks:
+            block.close()
+
+# 3. Per-Customer and Per-Company Risk Summaries Across a Process Pool
+def summarize_partitioned(transactions_df=None, model=None, workers=4, shards=None, threshold=None):
+    if transactions_df is None:
+        transactions_df = read_dataset('transactions', ['CustomerID', 'CompanyID', 'Amount'])
+    model = model or load_or_train_risk_model()
+    if len(model.coef_) != 1:
+        raise ValueError("Partitioned scoring supports the Amount-only model")
+    threshold = RISK_THRESHOLD if threshold is None else threshold
+    shards = shards or workers
+
+    customer_ids = transactions_df['CustomerID'].to_numpy(np.int64)
+    company_ids = transactions_df['CompanyID'].to_numpy(np.int64)
+    n_customers, n_companies = int(customer_ids.max(initial=0)), int(company_ids.max(initial=0))  # 0 when empty
+
+    # Group the rows by shard once, so each worker reads only its own contiguous range; a stable sort on
+    # 16-bit keys is a radix sort, O(rows)
+    bounds = np.linspace(0, n_customers + 1, shards + 1).astype(np.int64)
+    shard_of_row = (np.searchsorted(bounds, customer_ids, side='right') - 1).astype(np.int16)
+    order = np.argsort(shard_of_row, kind='stable')
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(shard_of_row, minlength=shards))])
+    del shard_of_row
+    inputs = SharedArrays({'CustomerID': customer_ids[order], 'CompanyID': company_ids[order],
+                           'Amount': transactions_df['Amount'].to_numpy()[order]})
+    del order
+    outputs = SharedArrays({
+        'customer_count': np.zeros(n_customers + 1, dtype=np.int64),
+        'customer_amount': np.zeros(n_customers + 1),
+        'customer_score': np.zeros(n_customers + 1),
+        'customer_risky': np.zeros(n_customers + 1),
+        'customer_max_score': np.zeros(n_customers + 1),
+    })
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            company_parts = list(pool.map(_summarize_shard, *zip(*[
+                (inputs.spec, outputs.spec, int(offsets[shard]), int(offsets[shard + 1]), int(bounds[shard]),
+                 int(bounds[shard + 1]), model.to_dict(), threshold, n_companies)
+                for shard in range(shards) if bounds[shard + 1] > bounds[shard]])))
+
+        count = outputs.array('customer_count')
+        seen = count > 0
+        customers = pd.DataFrame({
+            'CustomerID': np.flatnonzero(seen),
+            'Transactions': count[seen],
+            'TotalAmount': outputs.array('customer_amount')[seen],
+            'MeanRiskScore': outputs.array('customer_score')[seen] / count[seen],
+            'MaxRiskScore': outputs.array('customer_max_score')[seen],
+            'RiskyTransactions': outputs.array('customer_risky')[seen].astype(np.int64),
+        })
+        del count  # Views must not outlive the shared memory they point into
+    finally:
+        inputs.close()
+        outputs.close()
+
+    company_count, company_amount, company_score, company_risky = np.sum(company_parts, axis=0)
+    seen = company_count > 0
+    companies = pd.DataFrame({
+        'CompanyID': np.flatnonzero(seen),
+        'Transactions': company_count[seen].astype(np.int64),
+        'TotalAmount': company_amount[seen],
+        'MeanRiskScore': company_score[seen] / company_count[seen],
+        'RiskyTransactions': company_risky[seen].astype(np.int64),
+    })
+    return customers, companies
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Per-customer and per-company risk summaries across processes")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--top', type=int, default=10, help="riskiest customers to print")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    customers, companies = summarize_partitioned(workers=args.workers)
+    print(f"Summarized {customers['Transactions'].sum()} transactions in {time.perf_counter() - start:.2f}s")
+    print(companies.to_string(index=False))
+    print(customers.nlargest(args.top, 'MeanRiskScore').to_string(index=False))
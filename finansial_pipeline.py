@@ -0,0 +1,209 @@
+import argparse
+import asyncio
+import collections
+import csv
+import hashlib
+import os
+import random
+import time
+from datetime import datetime
+import numpy as np
+
+from finansial_ekosistem import (RISK_FEATURES, EntityRegistry, RiskAssessment, Transaction,
+                                 load_or_train_risk_model, random_transaction, score_batch)
+from finansial_ledger import Ledger
+
+# Column order of a transaction line, as in transactions.csv
+TRANSACTION_COLUMNS = ['TransactionID', 'Amount', 'Method', 'CustomerID', 'CompanyID', 'Timestamp', 'Hash']
+
+# 1. Parse One Transaction Line from a File or Socket
+def parse_number(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+def parse_transaction_line(line):
+    transaction_id, amount, method, customer_id, company_id, timestamp, *rest = next(csv.reader([line]))
+    hash = rest[0] if rest and rest[0] else \
+        hashlib.sha256(f"{transaction_id}{amount}{timestamp}".encode()).hexdigest()
+    if transaction_id.isdigit():
+        transaction_id = int(transaction_id)
+    return Transaction(transaction_id, parse_number(amount), method, int(customer_id), int(company_id), timestamp, hash)
+
+# 2. Throughput and End-to-End Latency Metrics
+class PipelineMetrics:
+    def __init__(self, window=100000):
+        self.processed = 0
+        self.batches = 0
+        self.started = None
+        self.finished = None
+        self.latencies = collections.deque(maxlen=window)  # Seconds from enqueue to stored, most recent only
+
+    def record_batch(self, received_times, now):
+        if self.started is None:
+            self.started = min(received_times)
+        self.finished = now
+        self.processed += len(received_times)
+        self.batches += 1
+        self.latencies.extend(now - received for received in received_times)
+
+    def summary(self):
+        elapsed = (self.finished - self.started) if self.processed else 0.0
+        latencies = np.fromiter(self.latencies, dtype=float) * 1000
+        p50, p99 = np.percentile(latencies, [50, 99]) if latencies.size else (0.0, 0.0)
+        return {
+            'processed': self.processed,
+            'batches': self.batches,
+            'seconds': elapsed,
+            'throughput_per_second': self.processed / elapsed if elapsed else 0.0,
+            'latency_p50_ms': float(p50),
+            'latency_p99_ms': float(p99),
+        }
+
+# 3. Bounded Queue with a Micro-Batching Scoring Consumer
+class IngestionPipeline:
+    def __init__(self, model, registry, queue_size=10000, batch_size=500, max_batch_delay=0.01):
+        self.model = model
+        self.registry = registry
+        self.batch_size = batch_size
+        self.max_batch_delay = max_batch_delay
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.metrics = PipelineMetrics()
+
+    async def submit(self, transaction):
+        # Blocks the producer while the queue is full, which is the backpressure
+        await self.queue.put((transaction, time.perf_counter()))
+
+    async def next_batch(self):
+        # Wait for one item, then take more until the batch is full or max_batch_delay passes
+        first = await self.queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.max_batch_delay
+        while len(batch) < self.batch_size:
+            try:
+                item = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                # Put the stop marker back so the consumer stops after this batch
+                self.queue.put_nowait(None)
+                break
+            batch.append(item)
+        return batch
+
+    def process(self, batch):
+        transactions = [transaction for transaction, _ in batch]
+        # Scored before they are registered, so the features only reflect earlier transactions
+        scores, _ = score_batch(self.model, transactions, feature_store=self.registry.feature_store)
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.registry.add_transactions(transactions)
+        for transaction, predicted_risk in zip(transactions, scores):
+            self.registry.add_risk_assessment(RiskAssessment(
+                assessment_id=f"RA{random.randint(1000, 9999)}",
+                risk_score=predicted_risk,
+                customer_id=transaction.customer_id,
+                transaction_id=transaction.transaction_id,
+                timestamp=timestamp,
+                model=self.model
+            ))
+        self.metrics.record_batch([received for _, received in batch], time.perf_counter())
+
+    async def consume(self):
+        while (batch := await self.next_batch()) is not None:
+            self.process(batch)
+            # Let producers refill the queue between batches
+            await asyncio.sleep(0)
+
+    async def run(self, *producers):
+        consumer = asyncio.create_task(self.consume())
+        try:
+            await asyncio.gather(*producers)
+        finally:
+            await self.queue.put(None)
+            await consumer
+        return self.metrics.summary()
+
+# 4. Producers: Simulator, File Tail and Local Socket
+async def simulator_producer(pipeline, count, rate=None):
+    # rate is transactions per second; None pushes as fast as the queue accepts
+    customers, companies = pipeline.registry.customers, pipeline.registry.companies
+    for i in range(count):
+        await pipeline.submit(random_transaction(random.choice(customers), random.choice(companies)))
+        if rate:
+            await asyncio.sleep(1 / rate)
+        elif i % 1000 == 0:
+            await asyncio.sleep(0)
+
+async def file_tail_producer(pipeline, path, from_start=False, poll_interval=0.1, idle_timeout=None):
+    # Follows lines appended to a CSV file with the transactions.csv columns
+    with open(path) as f:
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+        idle_since = time.perf_counter()
+        pending = ''
+        while True:
+            line = f.readline()
+            if not line:
+                if idle_timeout is not None and time.perf_counter() - idle_since > idle_timeout:
+                    return
+                await asyncio.sleep(poll_interval)
+                continue
+            idle_since = time.perf_counter()
+            pending += line
+            if not pending.endswith('\n'):
+                continue  # Partial line; the writer has not finished it yet
+            line, pending = pending.strip(), ''
+            if line and not line.startswith('TransactionID'):
+                await pipeline.submit(parse_transaction_line(line))
+
+async def socket_producer(pipeline, host='127.0.0.1', port=8765, duration=None):
+    # Accepts transaction lines from local clients, e.g. `nc 127.0.0.1 8765 < new_transactions.csv`
+    async def handle(reader, writer):
+        while line := await reader.readline():
+            line = line.decode().strip()
+            if line and not line.startswith('TransactionID'):
+                await pipeline.submit(parse_transaction_line(line))
+        writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        if duration is None:
+            await server.serve_forever()
+        else:
+            await asyncio.sleep(duration)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Stream transactions into the risk scoring pipeline")
+    parser.add_argument('--source', choices=['simulator', 'file', 'socket'], default='simulator')
+    parser.add_argument('--count', type=int, default=100000, help="transactions to simulate")
+    parser.add_argument('--rate', type=float, help="simulated transactions per second")
+    parser.add_argument('--path', help="CSV file to follow")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--duration', type=float, help="seconds to listen on the socket or wait for file lines")
+    parser.add_argument('--queue-size', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--ledger', help="ledger file to append processed transactions to")
+    args = parser.parse_args()
+
+    ledger = Ledger(args.ledger) if args.ledger else None
+    pipeline = IngestionPipeline(load_or_train_risk_model(features=RISK_FEATURES),
+                                 EntityRegistry.from_data(ledger, features=RISK_FEATURES),
+                                 queue_size=args.queue_size, batch_size=args.batch_size)
+    if args.source == 'simulator':
+        producer = simulator_producer(pipeline, args.count, args.rate)
+    elif args.source == 'file':
+        producer = file_tail_producer(pipeline, args.path, from_start=True, idle_timeout=args.duration)
+    else:
+        producer = socket_producer(pipeline, port=args.port, duration=args.duration)
+
+    for name, value in asyncio.run(pipeline.run(producer)).items():
+        print(f"{name}: {value:.3f}" if isinstance(value, float) else f"{name}: {value}")
@@ -1,21 +1,99 @@
 import streamlit as st
 import pandas as pd
+import functools
 import random
 import hashlib
+import time
 from datetime import datetime
-from finansial_ekosistem import initialize_entities, simulate_new_transactions, train_risk_model, RiskAssessment, Transaction, run_simulation
-from sklearn.linear_model import LinearRegression
+from finansial_ekosistem import EntityRegistry, random_transaction, load_or_train_risk_model, load_data, data_paths, data_version, score_batch, RiskAssessment, Transaction, run_simulation, RISK_THRESHOLD, RISK_FEATURES
+from finansial_ledger import LEDGER_PATH, Ledger
+from finansial_metrics import METRICS
 import numpy as np
 
-# Load the necessary dataframes
-risk_assessment_df = pd.read_csv('risk_assessment.csv')
-transactions_df = pd.read_csv('transactions.csv')
+rerun_started = time.perf_counter()
 
-# Initialize entities from the finansial_ekosistem.py module
-companies, customers, transactions, risk_assessments = initialize_entities()
+# Streamlit cache that also counts lookups; the body is timed only on a miss, which gives the hit rate
+def instrumented(cache, name):
+    def decorator(func):
+        cached = cache(METRICS.timer(name)(func))
+
+        @functools.wraps(func)
+        def lookup(*args, **kwargs):
+            METRICS.count(f"{name}.calls")
+            return cached(*args, **kwargs)
+        return lookup
+    return decorator
+
+# Keep the trained model in memory across reruns; the key changes only when the training CSVs do
+@instrumented(st.cache_resource, 'get_risk_model')
+def get_risk_model(version):
+    return load_or_train_risk_model(features=RISK_FEATURES)
+
+# Table slices are cached per version of the data files, so reruns and page flips reuse them
+@METRICS.timer('filter_transactions')
+def filter_transactions(customer_query, company_ids, amount_range):
+    _, customers_df, transactions_df, _ = load_data()
+    mask = transactions_df['Amount'].between(*amount_range)
+    if customer_query:
+        matching = customers_df.loc[customers_df['Name'].str.contains(customer_query, case=False, regex=False),
+                                    'CustomerID']
+        mask &= transactions_df['CustomerID'].isin(matching)
+    if company_ids:
+        mask &= transactions_df['CompanyID'].isin(company_ids)
+    return np.flatnonzero(mask.to_numpy())
+
+# Positions of the matching rows, computed once per filter; the count and every page are read from it.
+# Kept as a shared read-only resource so a hit does not copy the array
+@instrumented(functools.partial(st.cache_resource, max_entries=16), 'get_filtered_rows')
+def get_filtered_rows(version, customer_query, company_ids, amount_range):
+    return filter_transactions(customer_query, company_ids, amount_range)
+
+@instrumented(st.cache_data, 'get_transactions_page')
+def get_transactions_page(version, customer_query, company_ids, amount_range, page, page_size):
+    rows = get_filtered_rows(version, customer_query, company_ids, amount_range)
+    transactions_df = load_data()[2]
+    return transactions_df.iloc[paginate(rows, page, page_size)][['TransactionID', 'CustomerID', 'CompanyID', 'Amount']]
+
+@instrumented(st.cache_data, 'get_names_page')
+def get_names_page(version, dataset, label, page, page_size):
+    return paginate(load_data()[dataset][['Name']].rename(columns={'Name': label}), page, page_size)
+
+@instrumented(st.cache_data, 'get_amount_bounds')
+def get_amount_bounds(version):
+    amounts = load_data()[2]['Amount']
+    return int(amounts.min()), int(amounts.max())
+
+def paginate(rows, page, page_size):
+    # Works on DataFrames and on arrays of row positions
+    start, stop = (page - 1) * page_size, page * page_size
+    return rows.iloc[start:stop] if isinstance(rows, pd.DataFrame) else rows[start:stop]
+
+def page_controls(key, total):
+    # Only the rows of the selected page are sent to the browser
+    page_size = st.selectbox('Rows per page', [25, 50, 100, 500], key=f"{key}_page_size")
+    pages = max((total + page_size - 1) // page_size, 1)
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_page")
+    return int(page), page_size
+
+# Append-only ledger of transactions created in the app; opening it only reads the header, and appends are
+# locked against other writers such as finansial_pipeline.py --ledger
+@st.cache_resource
+def get_ledger():
+    return Ledger(LEDGER_PATH)
+
+# Shared entity registry, built once per version of the data files; new transactions are added to it in place
+@instrumented(st.cache_resource, 'get_registry')
+def get_registry(version):
+    return EntityRegistry.from_data(get_ledger(), features=RISK_FEATURES)
+
+# Load the persisted model, retraining on historical data only if the CSVs changed
+model = get_risk_model(data_version())
+
+# Version of the four data files, used as the cache key for the registry and the tables
+version = data_version(data_paths())
 
-# Train the model on historical data (load dataframes from CSVs)
-model = train_risk_model(risk_assessment_df, transactions_df)
+# Initialize entities from the finansial_ekosistem.py module
+registry = get_registry(version)
 
 st.set_page_config(layout="wide")
 
@@ -25,62 +103,56 @@ st.title('Risk Assessment Simulation for Transactions')
 # Create three columns: Left for transactions, middle for customers, right for companies, and simulating transactions
 col1, col2, col3, col4 = st.columns(4)
 
-# First Column: Displaying Transactions in Scrollable Area
+# First Column: Displaying Transactions, Filtered and Paginated
 with col1:
     st.header("Transactions")
     
-    # Create a dataframe to display transaction details
-    transaction_data = {
-        "CustomerID": [transaction.customer_id for transaction in transactions],
-        "Amount": [transaction.amount for transaction in transactions]
-    }
+    # Filter by customer name, company and amount range
+    with st.expander("Filters"):
+        customer_query = st.text_input('Customer name contains')
+        company_ids = st.multiselect('Companies', list(registry.companies_by_id),
+                                     format_func=lambda company_id: registry.companies_by_id[company_id].name)
+        amount_min, amount_max = get_amount_bounds(version)
+        amount_range = st.slider('Amount', amount_min, amount_max, (amount_min, amount_max))
     
-    # Convert to DataFrame
-    transactions_df_display = pd.DataFrame(transaction_data)
+    # Count the matches first so the page selector knows how many pages there are
+    filters = (customer_query, tuple(company_ids), amount_range)
+    total = len(get_filtered_rows(version, *filters))
+    page, page_size = page_controls('transactions', total)
+    transactions_df_display = get_transactions_page(version, *filters, page, page_size)
     
     # Display the DataFrame in Streamlit
-    st.dataframe(transactions_df_display)
+    st.dataframe(transactions_df_display, hide_index=True)
+    st.caption(f"{total} matching transactions")
 
 # Second Column: Displaying Customers in Table
 with col2:
     st.header("Customers")
     
-    # Create a dataframe for customers
-    customer_data = {
-        "Customer Name": [customer.name for customer in customers]
-    }
-    
-    # Convert to DataFrame
-    customers_df_display = pd.DataFrame(customer_data)
+    page, page_size = page_controls('customers', len(load_data()[1]))
+    customers_df_display = get_names_page(version, 1, "Customer Name", page, page_size)
     
     # Display the DataFrame in Streamlit
-    st.dataframe(customers_df_display)
+    st.dataframe(customers_df_display, hide_index=True)
 
 # Third Column: Displaying Companies in Table
 with col3:
     st.header("Companies")
     
-    # Create a dataframe for companies
-    company_data = {
-        "Company Name": [company.name for company in companies]
-    }
-    
-    # Convert to DataFrame
-    companies_df_display = pd.DataFrame(company_data)
+    page, page_size = page_controls('companies', len(load_data()[0]))
+    companies_df_display = get_names_page(version, 0, "Company Name", page, page_size)
     
     # Display the DataFrame in Streamlit
-    st.dataframe(companies_df_display)
+    st.dataframe(companies_df_display, hide_index=True)
 
 with col4:
     st.header("Create New Transaction")
     
     # Scrollable selectbox for choosing a Customer
-    customer_names = [customer.name for customer in customers]
-    selected_customer = st.selectbox('Select a Customer', customer_names)
+    selected_customer = st.selectbox('Select a Customer', registry.customer_names_df)
 
     # Scrollable selectbox for choosing a Company
-    company_names = [company.name for company in companies]
-    selected_company = st.selectbox('Select a Company', company_names)
+    selected_company = st.selectbox('Select a Company', registry.company_names_df)
 
     # Manually input transaction amount
     amount = st.number_input('Enter Transaction Amount', min_value=0, step=1)
@@ -96,8 +168,8 @@ with col4:
         hash = hashlib.sha256(f"{transaction_id}{amount}{method}{timestamp}".encode()).hexdigest()
 
         # Find the selected customer and company objects based on their names
-        selected_customer_obj = next(customer for customer in customers if customer.name == selected_customer)
-        selected_company_obj = next(company for company in companies if company.name == selected_company)
+        selected_customer_obj = registry.customers_by_name[selected_customer]
+        selected_company_obj = registry.companies_by_name[selected_company]
 
         # Create a new transaction
         new_transaction = Transaction(
@@ -110,30 +182,30 @@ with col4:
             hash=hash
         )
 
-        # Add the new transaction to the selected customer and company
-        selected_customer_obj.add_transaction(new_transaction)
-        selected_company_obj.transactions.append(new_transaction)
+        # Predict risk before registering the transaction, so the features only reflect earlier ones
+        scores, _ = score_batch(model, [new_transaction], feature_store=registry.feature_store)
+        predicted_risk = float(scores[0])
+
+        # Add the new transaction to the registry and to the selected customer and company
+        registry.add_transaction(new_transaction)
         
-        # Create or find the corresponding risk assessment
+        # Record the risk assessment for the new transaction
         risk_assessment = RiskAssessment(
             assessment_id=f"RA{random.randint(1000, 9999)}",
-            risk_score=0,  # Placeholder for risk score
+            risk_score=predicted_risk,
             customer_id=new_transaction.customer_id,
             transaction_id=new_transaction.transaction_id,
             timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             model=model  # Provide model for risk prediction
         )
-        
-        # Predict risk and display results
-        predicted_risk = risk_assessment.predict_risk(new_transaction.amount)
-        risk_assessment.risk_score = predicted_risk
+        registry.add_risk_assessment(risk_assessment)
         
         # Display the predicted risk score for the transaction
         st.write(f"Transaction ID: {new_transaction.transaction_id}, Amount: {new_transaction.amount}")
         st.write(f"Predicted Risk Score: {predicted_risk:.2f}")
         
         # Display if the transaction is risky or not based on the predicted score
-        if predicted_risk > 0.73:
+        if predicted_risk > RISK_THRESHOLD:
             st.write(f"Transaction {new_transaction.transaction_id} is risky!")
         else:
             st.write(f"Transaction {new_transaction.transaction_id} is not risky.")
@@ -141,16 +213,17 @@ with col4:
     # Button to simulate 10 new transactions
     if st.button("Simulate 10 Transactions"):
         # Simulate new transactions
-        new_transactions = simulate_new_transactions(customers, companies)
+        new_transactions = [random_transaction(random.choice(registry.customers), random.choice(registry.companies))
+                            for _ in range(10)]
+        
+        # Predict risk for all new transactions with a single model call, then register them
+        scores, risky = score_batch(model, new_transactions, feature_store=registry.feature_store)
+        registry.add_transactions(new_transactions)
         
-        # Iterate over the new transactions and predict risk for each
-        for new_transaction in new_transactions:
+        # Iterate over the new transactions and record the predicted risk for each
+        for new_transaction, predicted_risk, is_risky in zip(new_transactions, scores, risky):
             # Create or find the corresponding risk assessment for the transaction
-            risk_assessment = None
-            for assessment in risk_assessments:
-                if assessment.transaction_id == new_transaction.transaction_id:
-                    risk_assessment = assessment
-                    break
+            risk_assessment = registry.assessment_for(new_transaction.transaction_id)
             
             if risk_assessment is None:
                 # If no existing risk assessment, create a new one
@@ -162,19 +235,55 @@ with col4:
                     timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                     model=model  # Provide model for risk prediction
                 )
-                risk_assessments.append(risk_assessment)  # Add to the list of assessments
-
-            # Now, predict the risk if risk_assessment exists
-            if risk_assessment and risk_assessment.model:
-                predicted_risk = risk_assessment.predict_risk(new_transaction.amount)
-                risk_assessment.risk_score = predicted_risk  # Update the risk score
-
-                # Display the predicted risk score for the transaction
-                st.write(f"Transaction ID: {new_transaction.transaction_id}, Amount: {new_transaction.amount}")
-                st.write(f"Predicted Risk Score: {predicted_risk:.2f}")
-
-                # Simulate whether the loan is risky or not based on predicted risk score
-                if predicted_risk > 0.73:
-                    st.write(f"Transaction {new_transaction.transaction_id} is risky!")
-                else:
-                    st.write(f"Transaction {new_transaction.transaction_id} is not risky.")
+                registry.add_risk_assessment(risk_assessment)  # Add to the list of assessments and link it
+
+            risk_assessment.risk_score = predicted_risk  # Update the risk score
+
+            # Display the predicted risk score for the transaction
+            st.write(f"Transaction ID: {new_transaction.transaction_id}, Amount: {new_transaction.amount}")
+            st.write(f"Predicted Risk Score: {predicted_risk:.2f}")
+
+            # Simulate whether the loan is risky or not based on predicted risk score
+            if is_risky:
+                st.write(f"Transaction {new_transaction.transaction_id} is risky!")
+            else:
+                st.write(f"Transaction {new_transaction.transaction_id} is not risky.")
+
+    # Latest ledger records, read through the memory map without loading the rest of the file
+    with st.expander("Ledger"):
+        ledger = get_ledger()
+        st.caption(f"{len(ledger)} transactions in {LEDGER_PATH}")
+        with METRICS.stage('ledger_tail'):
+            ledger_tail = ledger.to_frame(max(len(ledger) - 10, 0))
+        st.dataframe(ledger_tail, hide_index=True)
+        if st.button("Verify Hash Chain"):
+            broken = ledger.verify()
+            if broken is None:
+                st.write("Hash chain intact")
+            else:
+                st.write(f"Hash chain broken at record {broken}")
+
+# Sidebar metrics panel, drawn last so it includes every stage of this run. Collection is process-wide and set
+# with FINANSIAL_METRICS=1; each session only chooses whether to show the panel
+if METRICS.enabled:
+    METRICS.record('rerun', time.perf_counter() - rerun_started)
+else:
+    st.sidebar.caption("Metrics are off; start the app with FINANSIAL_METRICS=1 to collect them")
+if METRICS.enabled and st.sidebar.checkbox('Show metrics', key='show_metrics'):
+    with st.sidebar:
+        st.header("Metrics")
+        summary = METRICS.summary()
+        st.dataframe(summary, hide_index=True)
+
+        # Latency histogram for one stage at a time
+        selected_stage = st.selectbox('Latency histogram', summary['stage'])
+        if selected_stage is not None:
+            st.bar_chart(METRICS.histogram(selected_stage))
+
+        hit_rates = METRICS.cache_hit_rates()
+        st.dataframe(pd.DataFrame({'Cache': list(hit_rates), 'Hit Rate': list(hit_rates.values())}), hide_index=True)
+
+        if st.button("Export Metrics"):
+            st.write(f"Metrics written to {METRICS.export()}")
+        if st.button("Reset Metrics"):
+            METRICS.reset()
@@ -0,0 +1,65 @@
+import argparse
+import os
+import pandas as pd
+
+# Parquet support is optional; without pyarrow every dataset is read from CSV
+try:
+    import pyarrow  # noqa: F401
+    HAVE_PARQUET = True
+except ImportError:
+    HAVE_PARQUET = False
+
+# Column types for each dataset, in file order
+SCHEMAS = {
+    'companies': {'CompanyID': 'int64', 'Name': 'str', 'Address': 'str'},
+    'customers': {'CustomerID': 'int64', 'Name': 'str', 'Phone': 'str', 'Address': 'str'},
+    'transactions': {'TransactionID': 'int64', 'Amount': 'int64', 'Method': 'category', 'CustomerID': 'int64',
+                     'CompanyID': 'int64', 'Timestamp': 'datetime64[ns]', 'Hash': 'str'},
+    'risk_assessment': {'AssessmentID': 'int64', 'RiskScore': 'float64', 'Timestamp': 'datetime64[ns]',
+                        'CustomerID': 'int64', 'TransactionID': 'int64'},
+}
+
+# 1. Resolve Which File Backs a Dataset
+def dataset_path(name, directory='.'):
+    csv_path = os.path.join(directory, f"{name}.csv")
+    parquet_path = os.path.join(directory, f"{name}.parquet")
+    # Prefer the Parquet copy unless the CSV was modified after it was converted
+    if HAVE_PARQUET and os.path.exists(parquet_path):
+        if not os.path.exists(csv_path) or os.stat(parquet_path).st_mtime_ns >= os.stat(csv_path).st_mtime_ns:
+            return parquet_path
+    return csv_path
+
+# 2. Read a Dataset with Proper Types, Loading Only the Requested Columns
+def read_dataset(name, columns=None, path=None, directory='.'):
+    path = path or dataset_path(name, directory)
+    schema = SCHEMAS[name]
+    columns = list(columns or schema)
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, columns=columns)
+
+    dtypes = {column: schema[column] for column in columns if not schema[column].startswith('datetime')}
+    df = pd.read_csv(path, usecols=columns, dtype=dtypes)[columns]
+    for column in columns:
+        if schema[column].startswith('datetime'):
+            df[column] = pd.to_datetime(df[column], format='ISO8601')
+    return df
+
+# 3. Convert the CSV Files to Parquet Once
+def convert_to_parquet(names=tuple(SCHEMAS), directory='.'):
+    if not HAVE_PARQUET:
+        raise RuntimeError("Converting to Parquet requires pyarrow")
+    written = []
+    for name in names:
+        df = read_dataset(name, path=os.path.join(directory, f"{name}.csv"))
+        parquet_path = os.path.join(directory, f"{name}.parquet")
+        df.to_parquet(parquet_path, index=False)
+        written.append(parquet_path)
+    return written
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convert the finansial CSV datasets to Parquet")
+    parser.add_argument('--directory', default='.')
+    parser.add_argument('names', nargs='*', default=list(SCHEMAS))
+    args = parser.parse_args()
+    for path in convert_to_parquet(args.names, args.directory):
+        print(f"Wrote {path}")